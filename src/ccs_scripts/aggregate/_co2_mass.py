@@ -1,9 +1,7 @@
-import copy
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, TypedDict, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
-import xtgeo
 from resdata.resfile import ResdataFile
 from resfo._unformatted.write import unformatted_write
 from xtgeo.io._file import FileWrapper
@@ -30,10 +28,15 @@ class MapName(Enum):
     MASSFGAS = "co2_mass_free_gas_phase"
 
 
-class PropertyGridOutput(TypedDict):
-    data: np.ndarray
-    unrst_path: str
-    egrid_path: str
+_PHASE_OF_KW = {
+    "MASS_DIS": "dis_water_phase",
+    "MASS_GAS": "gas_phase",
+    "MASSTGAS": "trapped_gas_phase",
+    "MASSFGAS": "free_gas_phase",
+}
+
+# Order of the UNRST-file paths returned by translate_co2data_to_property
+_RETURNED_KWS = ["MASS_GAS", "MASS_DIS", "MASS_TOT", "MASSFGAS", "MASSTGAS"]
 
 
 def _get_gasless(properties: Dict[str, Dict[str, List[np.ndarray]]]) -> np.ndarray:
@@ -81,10 +84,11 @@ def translate_co2data_to_property(
         properties_to_extract (List): Names of the properties to be extracted
 
     Returns:
-        List[List[xtgeo.GridProperty]]
+        List[Optional[str]]
 
     """
-    gas_idxs = _get_gas_idxs(co2_mass_settings.unrst_source, properties_to_extract)
+    unrst_data = ResdataFile(co2_mass_settings.unrst_source)
+    gas_idxs = _get_gas_idxs(unrst_data, properties_to_extract)
     maps = co2_mass_settings.maps
     if maps is None:
         maps = []
@@ -92,135 +96,81 @@ def translate_co2data_to_property(
         maps = [maps]
     maps = [map_name.lower() for map_name in maps]
 
-    mass_data_template: Dict[str, List[Any]] = {
-        "unrst_path": [],
-        "unrst_kw": [],
-        "egrid_path": [],
-        "egrid_kw": [],
-    }
-    total_mass_data = copy.deepcopy(mass_data_template)
-    dissolved_mass_data = copy.deepcopy(mass_data_template)
-    free_mass_data = copy.deepcopy(mass_data_template)
-    free_gas_mass_data = copy.deepcopy(mass_data_template)
-    trapped_gas_mass_data = copy.deepcopy(mass_data_template)
-
-    unrst_data = ResdataFile(co2_mass_settings.unrst_source)
     grid_data = ResdataFile(grid_file)
     store_all = "all" in maps or len(maps) == 0
+    kws_to_export = []
+    if store_all or "total_co2" in maps:
+        kws_to_export.append("MASS_TOT")
+    if store_all or "dissolved_co2" in maps:
+        kws_to_export.append("MASS_DIS")
+    if store_all or "free_co2" in maps:
+        if co2_mass_settings.residual_trapping:
+            kws_to_export.extend(["MASSFGAS", "MASSTGAS"])
+        else:
+            kws_to_export.append("MASS_GAS")
 
     custom_egrid = _create_custom_egrid_kw(grid_data)
-
-    for date_idx, co2_at_date in zip(dates_idx, co2_data.data_list):
-        mass_as_grid = _convert_to_grid(co2_at_date, gas_idxs, grid_file, grid_out_dir)
-        logihead_array = np.array([x for x in unrst_data["LOGIHEAD"][date_idx]])
-        if store_all or "total_co2" in maps:
-            total_mass_data["unrst_kw"].extend(
-                [
-                    ("SEQNUM  ", [date_idx]),
-                    ("INTEHEAD", unrst_data["INTEHEAD"][date_idx].numpyView()),
-                    ("LOGIHEAD", logihead_array),
-                    ("MASS_TOT", mass_as_grid["MASS_TOT"]["data"]),
-                ]
-            )
-            if (
-                mass_as_grid["MASS_TOT"]["unrst_path"]
-                not in total_mass_data["unrst_path"]
-            ):
-                total_mass_data["unrst_path"].append(
-                    mass_as_grid["MASS_TOT"]["unrst_path"]
-                )
-                total_mass_data["egrid_path"].append(
-                    mass_as_grid["MASS_TOT"]["egrid_path"]
-                )
-                total_mass_data["egrid_kw"].extend(custom_egrid)
-        if store_all or "dissolved_co2" in maps:
-            dissolved_mass_data["unrst_kw"].extend(
-                [
-                    ("SEQNUM  ", [date_idx]),
-                    ("INTEHEAD", unrst_data["INTEHEAD"][date_idx].numpyView()),
-                    ("LOGIHEAD", logihead_array),
-                    ("MASS_DIS", mass_as_grid["MASS_DIS"]["data"]),
-                ]
-            )
-            if (
-                mass_as_grid["MASS_DIS"]["unrst_path"]
-                not in dissolved_mass_data["unrst_path"]
-            ):
-                dissolved_mass_data["unrst_path"].append(
-                    mass_as_grid["MASS_DIS"]["unrst_path"]
-                )
-                dissolved_mass_data["egrid_path"].append(
-                    mass_as_grid["MASS_DIS"]["egrid_path"]
-                )
-                dissolved_mass_data["egrid_kw"].extend(custom_egrid)
-        if (
-            store_all or "free_co2" in maps
-        ) and not co2_mass_settings.residual_trapping:
-            free_mass_data["unrst_kw"].extend(
-                [
-                    ("SEQNUM  ", [date_idx]),
-                    ("INTEHEAD", unrst_data["INTEHEAD"][date_idx].numpyView()),
-                    ("LOGIHEAD", logihead_array),
-                    ("MASS_GAS", mass_as_grid["MASS_GAS"]["data"]),
-                ]
+    act_cells = _count_active_cells(grid_data)
+
+    # Headers are read once and shared by all exported properties
+    inteheads = unrst_data["INTEHEAD"]
+    logiheads = unrst_data["LOGIHEAD"]
+    headers = []
+    for date_idx in dates_idx[: len(co2_data.data_list)]:
+        # Boolean keywords do not support numpy_copy in resdata
+        logihead = logiheads[date_idx]
+        headers.append(
+            (
+                inteheads[date_idx].numpy_copy(),
+                np.fromiter(logihead, dtype=bool, count=len(logihead)),
             )
-            if (
-                mass_as_grid["MASS_GAS"]["unrst_path"]
-                not in free_mass_data["unrst_path"]
-            ):
-                free_mass_data["unrst_path"].append(
-                    mass_as_grid["MASS_GAS"]["unrst_path"]
-                )
-                free_mass_data["egrid_path"].append(
-                    mass_as_grid["MASS_GAS"]["egrid_path"]
-                )
-                free_mass_data["egrid_kw"].extend(custom_egrid)
-        if (store_all or "free_co2" in maps) and co2_mass_settings.residual_trapping:
-            free_gas_mass_data["unrst_kw"].extend(
-                [
-                    ("SEQNUM  ", [date_idx]),
-                    ("INTEHEAD", unrst_data["INTEHEAD"][date_idx].numpyView()),
-                    ("LOGIHEAD", logihead_array),
-                    ("MASSFGAS", mass_as_grid["MASSFGAS"]["data"]),
-                ]
-            )
-            if (
-                mass_as_grid["MASSFGAS"]["unrst_path"]
-                not in free_gas_mass_data["unrst_path"]
-            ):
-                free_gas_mass_data["unrst_path"].append(
-                    mass_as_grid["MASSFGAS"]["unrst_path"]
-                )
-                free_gas_mass_data["egrid_path"].append(
-                    mass_as_grid["MASSFGAS"]["egrid_path"]
-                )
-                free_gas_mass_data["egrid_kw"].extend(custom_egrid)
-            trapped_gas_mass_data["unrst_kw"].extend(
-                [
-                    ("SEQNUM  ", [date_idx]),
-                    ("INTEHEAD", unrst_data["INTEHEAD"][date_idx].numpyView()),
-                    ("LOGIHEAD", logihead_array),
-                    ("MASSTGAS", mass_as_grid["MASSTGAS"]["data"]),
-                ]
-            )
-            if (
-                mass_as_grid["MASSTGAS"]["unrst_path"]
-                not in trapped_gas_mass_data["unrst_path"]
+        )
+    if len(headers) == 0:
+        return [None] * len(_RETURNED_KWS)
+
+    # The properties are exported one at a time, and each date is written to the
+    # UNRST-file as soon as it is scattered onto the grid. Only a single grid-sized
+    # array is kept in memory, and it is reused for all dates of a property.
+    unrst_paths: Dict[str, str] = {}
+    for kw in kws_to_export:
+        unrst_path = f"{grid_out_dir}/{MapName[kw].value}.UNRST"
+        # Stored as single precision (REAL), like other UNRST properties
+        mass_array = np.zeros(act_cells, dtype=np.float32)
+        outfile_wrapper = FileWrapper(unrst_path, mode="rb")
+        with open(outfile_wrapper.file, "wb") as stream:
+            for date_idx, (intehead_array, logihead_array), co2_at_date in zip(
+                dates_idx, headers, co2_data.data_list
             ):
-                trapped_gas_mass_data["unrst_path"].append(
-                    mass_as_grid["MASSTGAS"]["unrst_path"]
+                mass_array[gas_idxs] = _co2_mass_of_kw(co2_at_date, kw)
+                unformatted_write(
+                    stream,
+                    [
+                        ("SEQNUM  ", [date_idx]),
+                        ("INTEHEAD", intehead_array),
+                        ("LOGIHEAD", logihead_array),
+                        (kw, mass_array),
+                    ],
                 )
-                trapped_gas_mass_data["egrid_path"].append(
-                    mass_as_grid["MASSTGAS"]["egrid_path"]
-                )
-                trapped_gas_mass_data["egrid_kw"].extend(custom_egrid)
-    return [
-        _export_unrst_and_kw_data(free_mass_data),
-        _export_unrst_and_kw_data(dissolved_mass_data),
-        _export_unrst_and_kw_data(total_mass_data),
-        _export_unrst_and_kw_data(free_gas_mass_data),
-        _export_unrst_and_kw_data(trapped_gas_mass_data),
-    ]
+        _export_egrid(f"{grid_out_dir}/{MapName[kw].value}.EGRID", custom_egrid)
+        unrst_paths[kw] = unrst_path
+    return [unrst_paths.get(kw) for kw in _RETURNED_KWS]
+
+
+def _co2_mass_of_kw(co2_at_date: Co2DataAtTimeStep, kw: str) -> np.ndarray:
+    """
+    Amount of CO2 in the phase corresponding to an exported keyword
+
+    Args:
+        co2_at_date (Co2DataAtTimeStep): Amount of CO2 per phase at each cell
+                                         at a time step
+        kw (str): Name of the exported keyword (see MapName)
+
+    Returns:
+        np.ndarray
+    """
+    if kw == "MASS_TOT":
+        return co2_at_date.total_mass()
+    return getattr(co2_at_date, _PHASE_OF_KW[kw])
 
 
 def _create_custom_egrid_kw(
@@ -269,97 +219,49 @@ def _create_custom_egrid_kw(
     return custom_egrid
 
 
-def _export_unrst_and_kw_data(mass_data: Dict[str, List[Any]]) -> Optional[str]:
+def _count_active_cells(grid_data: ResdataFile) -> int:
+    """
+    Counts the active cells from the ACTNUM keyword of an EGRID-file, avoiding
+    a full parse of the grid geometry. All cells are active if ACTNUM is absent.
     """
-    Exports the grid with the property at different time steps as well as
-    the path where the file is located
+    if "ACTNUM" in grid_data:
+        return int(np.count_nonzero(grid_data["ACTNUM"][0].numpy_view()))
+    gridhead = grid_data["GRIDHEAD"][0]
+    return int(gridhead[1] * gridhead[2] * gridhead[3])
 
-    Args:
-        mass_data (Dict[str,List[Any]]): A dict with
-        the information that feeds the 3d grid properties
 
-        Returns:
-             Optional[str]
+def _export_egrid(
+    egrid_path: str,
+    custom_egrid: List[Tuple[str, Union[List[int], np.ndarray]]],
+) -> None:
     """
-    if len(mass_data["unrst_path"]) > 0:
-        outfile_wrapper = FileWrapper(mass_data["unrst_path"][0], mode="rb")
-        with open(outfile_wrapper.file, "wb") as stream:
-            unformatted_write(stream, mass_data["unrst_kw"])
-        grid_outfile_wrapper = FileWrapper(mass_data["egrid_path"][0], mode="rb")
-        with open(grid_outfile_wrapper.file, "wb") as stream:
-            unformatted_write(stream, mass_data["egrid_kw"])
-        return mass_data["unrst_path"][0]
-    else:
-        return None
+    Exports the grid that accompanies a co2_mass property
+
+    Args:
+        egrid_path (str): Path to the EGRID-file to write
+        custom_egrid (List): Keywords of the EGRID-file
+    """
+    grid_outfile_wrapper = FileWrapper(egrid_path, mode="rb")
+    with open(grid_outfile_wrapper.file, "wb") as stream:
+        unformatted_write(stream, custom_egrid)
 
 
 def _get_gas_idxs(
-    unrst_file: str,
+    unrst: ResdataFile,
     properties_to_extract: List[str],
 ) -> np.ndarray:
     """
     Gets the global index of cells with CO2
 
     Args:
-        unrst_file (str): Path to UNRST-file
+        unrst (ResdataFile): The UNRST-file
         properties_to_extract (List): Names of the properties to be extracted
 
     Returns:
         np.ndarray
 
     """
-    unrst = ResdataFile(unrst_file)
     properties, _ = _fetch_properties(unrst, properties_to_extract)
     gasless = _get_gasless(properties)
-    gas_idxs = np.array([index for index, value in enumerate(gasless) if not value])
+    gas_idxs = np.flatnonzero(~gasless)
     return gas_idxs
-
-
-def _convert_to_grid(
-    co2_at_date: Co2DataAtTimeStep,
-    gas_idxs: np.ndarray,
-    grid_file: str,
-    grid_out_dir: str,
-) -> Dict[str, PropertyGridOutput]:
-    """
-    Store CO2DataAtTimeStep for a property in a 3DGridProperties object
-
-    Args:
-        co2_at_date (Co2DataAtTimeStep):       Amount of CO2 per phase at each cell
-                                               at each time step
-        gas_idxs (np.ndarray):                 Global index of cells with CO2
-        grid_file (str):                       Path to EGRID-file
-        grid_out_dir (str):                    Path to store the produced
-                                               3D GridProperties
-
-    Returns:
-        Dict[str, xtgeo.GridProperty]
-    """
-    mass_grid_output = {}
-    for mass, name in zip(
-        [
-            co2_at_date.total_mass(),
-            co2_at_date.dis_water_phase,
-            co2_at_date.gas_phase,
-            co2_at_date.trapped_gas_phase,
-            co2_at_date.free_gas_phase,
-        ],
-        [
-            "MASS_TOT",
-            "MASS_DIS",
-            "MASS_GAS",
-            "MASSTGAS",
-            "MASSFGAS",
-        ],
-    ):
-        grid_pf = xtgeo.grid_from_file(grid_file)
-        act_cells = len(grid_pf.actnum_indices)
-        mass_array = np.zeros(act_cells, dtype=mass.dtype)
-        mass_array[gas_idxs] = mass
-        prop_grid_output: PropertyGridOutput = {
-            "data": mass_array,
-            "unrst_path": grid_out_dir + "/" + str(MapName[name].value) + ".UNRST",
-            "egrid_path": grid_out_dir + "/" + str(MapName[name].value) + ".EGRID",
-        }
-        mass_grid_output[name] = prop_grid_output
-    return mass_grid_output
@@ -1,14 +1,17 @@
 #!/usr/bin/env python
+import functools
 import logging
 import os
 import pathlib
+import struct
 import sys
-import warnings
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple, Union
 
 import numpy as np
 import xtgeo
 from xtgeo.common import XTGeoDialog
+from xtgeo.common.constants import UNDEF_MAP_IRAPB
 
 from ccs_scripts.aggregate._co2_mass import MapName
 from ccs_scripts.aggregate._config import (
@@ -49,10 +52,13 @@ def write_plot_using_plotly(surf: xtgeo.RegularSurface, filename):
     # pylint: disable=import-outside-toplevel
     import plotly.express as px
 
-    x_nodes = surf.xori + np.arange(0, surf.ncol) * surf.xinc
-    y_nodes = surf.yori + np.arange(0, surf.nrow) * surf.yinc
+    x_nodes = np.linspace(surf.xori, surf.xori + (surf.ncol - 1) * surf.xinc, surf.ncol)
+    y_nodes = np.linspace(surf.yori, surf.yori + (surf.nrow - 1) * surf.yinc, surf.nrow)
     px.imshow(
-        surf.values.filled(np.nan).T, x=x_nodes, y=y_nodes, origin="lower"
+        np.ascontiguousarray(surf.values.filled(np.nan).T),
+        x=x_nodes,
+        y=y_nodes,
+        origin="lower",
     ).write_html(filename.with_suffix(".html"), include_plotlyjs="cdn")
 
 
@@ -76,12 +82,10 @@ def _check_input(computesettings: ComputeSettings) -> None:
 
 
 def modify_mass_property_names(properties: List[xtgeo.GridProperty]):
-    if any("MASS" in p.name for p in properties):
-        for p in properties:
-            if "MASS" in p.name:
-                mass_prop_name = p.name.split("--")[0]
-                mass_prop_date = p.name.split("--")[1]
-                p.name = f"{MapName[mass_prop_name].value}--{mass_prop_date}"
+    for p in properties:
+        if "MASS" in p.name:
+            mass_prop_name, _, mass_prop_date = p.name.partition("--")
+            p.name = f"{MapName[mass_prop_name].value}--{mass_prop_date}"
 
 
 def _log_grid_info(grid: xtgeo.Grid) -> None:
@@ -195,16 +199,14 @@ def generate_maps(
         _log_surfaces_exported(surfs, [f[0] for f in _filters], "aggregate")
     if computesettings.indicator_map:
         prop_tags_indicator = [p.replace("max", "indicator") for p in prop_tags]
-        p_maps_indicator = [
-            [np.where(np.isfinite(p), 1, 0) for p in map_] for map_ in p_maps
-        ]
         surfs_indicator = _ndarray_to_regsurfs(
             [f[0] for f in _filters],
             prop_tags_indicator,
             xn,
             yn,
-            p_maps_indicator,
+            p_maps,
             output.lowercase,
+            indicator=True,
         )
         _write_surfaces(
             surfs_indicator, output.mapfolder, output.plotfolder, output.use_plotly
@@ -212,6 +214,15 @@ def generate_maps(
         _log_surfaces_exported(surfs_indicator, [f[0] for f in _filters], "indicator")
 
 
+def _surface_values(map_: np.ndarray, indicator: bool) -> np.ma.MaskedArray:
+    if indicator:
+        # 1 where the map is defined and 0 elsewhere, with no masked nodes
+        values = np.empty_like(map_)
+        np.isfinite(map_, out=values)
+        return np.ma.MaskedArray(values, mask=np.ma.nomask)
+    return np.ma.masked_where(np.isnan(map_), map_)
+
+
 def _property_tag(prop: str, agg_method: AggregationMethod, agg_tag: bool):
     agg = f"{agg_method.value}_" if agg_tag else ""
     return f"{agg}{prop}"
@@ -225,7 +236,9 @@ def _ndarray_to_regsurfs(
     y_nodes: np.ndarray,
     maps: List[List[np.ndarray]],
     lowercase: bool,
+    indicator: bool = False,
 ) -> List[xtgeo.RegularSurface]:
+    deduce_name = _deduce_lowercase_surface_name if lowercase else _deduce_surface_name
     return [
         xtgeo.RegularSurface(
             ncol=x_nodes.size,
@@ -234,19 +247,79 @@ def _ndarray_to_regsurfs(
             yinc=y_nodes[1] - y_nodes[0],
             xori=x_nodes[0],
             yori=y_nodes[0],
-            values=np.ma.array(map_, mask=np.isnan(map_)),
-            name=_deduce_surface_name(fn, prop, lowercase),
+            values=_surface_values(map_, indicator),
+            name=deduce_name(fn, prop),
         )
         for fn, inner in zip(filter_names, maps)
         for prop, map_ in zip(prop_names, inner)
     ]
 
 
-def _deduce_surface_name(filter_name, property_name, lowercase):
-    name = f"{filter_name}--{property_name}"
-    if lowercase:
-        name = name.lower()
-    return name
+def _deduce_surface_name(filter_name, property_name):
+    return f"{filter_name}--{property_name}"
+
+
+def _deduce_lowercase_surface_name(filter_name, property_name):
+    return f"{filter_name}--{property_name}".lower()
+
+
+def _write_irap_binary(surface: xtgeo.RegularSurface, filename: pathlib.Path):
+    """
+    Writes a surface in the Irap binary format (same output as
+    RegularSurface.to_file). The header is shared by all maps on the same
+    template, and the values are written as one record per row with a single
+    buffer, instead of going through the generic xtgeo export for every map.
+    """
+    header = _irap_binary_header(
+        surface.ncol,
+        surface.nrow,
+        surface.xori,
+        surface.yori,
+        surface.xinc,
+        surface.yinc * surface.yflip,
+        surface.rotation,
+    )
+    values = surface.get_values1d(fill_value=UNDEF_MAP_IRAPB, order="F")
+    records = np.empty((surface.nrow, surface.ncol + 2), dtype=">f4")
+    records[:, 1:-1] = values.reshape(surface.nrow, surface.ncol)
+    records.view(">i4")[:, [0, -1]] = surface.ncol * 4
+    with open(filename, "wb") as stream:
+        stream.write(header)
+        stream.write(records.tobytes())
+
+
+@functools.lru_cache(maxsize=8)
+def _irap_binary_header(
+    ncol: int,
+    nrow: int,
+    xori: float,
+    yori: float,
+    xinc: float,
+    yinc: float,
+    rotation: float,
+) -> bytes:
+    return struct.pack(
+        ">3i6f3i3f10i",
+        32,
+        -996,
+        nrow,
+        xori,
+        xori + xinc * (ncol - 1),
+        yori,
+        yori + yinc * (nrow - 1),
+        xinc,
+        yinc,
+        32,
+        16,
+        ncol,
+        rotation,
+        xori,
+        yori,
+        16,
+        28,
+        *[0] * 7,
+        28,
+    )
 
 
 def _write_surfaces(
@@ -269,15 +342,20 @@ def _write_surfaces(
         if not os.path.exists(plot_folder):
             logging.warning("WARNING: Specified plot folder does not exist")
 
-    for surface in surfaces:
-        with warnings.catch_warnings():
-            # Can ignore xtgeo-warning for few/zero active nodes
-            # (can happen for first map, before injection)
-            warnings.filterwarnings("ignore", message=r"Number of maps nodes are*")
-            surface.to_file(
-                (pathlib.Path(map_folder) / surface.name).with_suffix(".gri")
+    # Writing the maps is mostly I/O, so the files are written concurrently
+    with ThreadPoolExecutor(max_workers=min(8, len(surfaces) or 1)) as executor:
+        list(
+            executor.map(
+                lambda surface: _write_irap_binary(
+                    surface,
+                    (pathlib.Path(map_folder) / surface.name).with_suffix(".gri"),
+                ),
+                surfaces,
             )
-        if plot_folder and os.path.exists(plot_folder):
+        )
+    if plot_folder and os.path.exists(plot_folder):
+        # Plotting libraries are not thread-safe, so plots are made sequentially
+        for surface in surfaces:
             pn = pathlib.Path(plot_folder) / surface.name
             if use_plotly:
                 write_plot_using_plotly(surface, pn)
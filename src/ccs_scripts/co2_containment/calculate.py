@@ -1,11 +1,14 @@
 """CO2 calculation methods"""
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 import numpy as np
-from shapely.geometry import MultiPolygon, Point, Polygon
+import shapely
+from shapely.geometry import MultiPolygon, Polygon
 
 from ccs_scripts.co2_containment.co2_calculation import (
     CalculationType,
@@ -48,9 +51,16 @@ class ContainedCo2:
         function converts it to the format yyyy-mm-dd
 
         """
-        if "-" not in self.date:
-            date = self.date
-            self.date = f"{date[:4]}-{date[4:6]}-{date[6:]}"
+        self.date = _format_date(self.date)
+
+
+def _format_date(date: str) -> str:
+    """
+    Converts a date to the format yyyy-mm-dd, unless it already contains "-"
+    """
+    if "-" not in date:
+        return f"{date[:4]}-{date[4:6]}-{date[6:]}"
+    return date
 
 
 # pylint: disable = too-many-arguments, too-many-locals
@@ -99,7 +109,7 @@ def calculate_co2_containment(
     _log_summary_of_grid_node_location(locations)
     phases = _lists_of_phases(calc_type, residual_trapping, co2_data.scenario)
 
-    # List of tuple with (zone/None, None/region, boolean array over grid)
+    # List of tuple with (zone/None, None/region, indices of grid nodes)
     zone_region_info = _zone_and_region_mapping(co2_data, int_to_zone, int_to_region)
 
     if plume_groups is not None:
@@ -110,47 +120,115 @@ def calculate_co2_containment(
     else:
         plume_names = set()
 
-    containment = []
-    for zone, region, is_in_section in zone_region_info:
-        for location, is_in_location in locations.items():
-            for i, co2_at_timestep in enumerate(co2_data.data_list):
-                co2_amounts_for_each_phase = _lists_of_co2_for_each_phase(
-                    co2_at_timestep,
-                    calc_type,
-                    residual_trapping,
+    # The plume groups only depend on the time step
+    if plume_groups is not None:
+        plume_group_infos = [
+            _plume_group_mapping(plume_names, plume_groups_at_timestep)
+            for plume_groups_at_timestep in plume_groups
+        ]
+    else:
+        plume_group_infos = [{"all": np.ones(len(co2_data.x_coord), dtype=bool)}] * len(
+            co2_data.data_list
+        )
+    dtype = np.int64 if calc_type == CalculationType.CELL_VOLUME else np.float64
+
+    # Amounts of CO2 with shape (time steps, phases, grid nodes), and location
+    # membership with shape (locations, grid nodes), such that the amounts of all
+    # time steps, phases and locations are found with a single matrix product
+    location_names = list(locations.keys())
+    is_in_locations = np.stack(list(locations.values())).astype(dtype)
+    co2_amounts = np.array(
+        [
+            _lists_of_co2_for_each_phase(
+                co2_at_timestep,
+                calc_type,
+                residual_trapping,
+            )[: len(phases)]
+            for co2_at_timestep in co2_data.data_list
+        ],
+        dtype=dtype,
+    )
+
+    # Formatted once per time step, so ContainedCo2 gets dates that need no change
+    dates = [
+        _format_date(co2_at_timestep.date) for co2_at_timestep in co2_data.data_list
+    ]
+
+    # The zones/regions are independent, and numpy releases the GIL while summing
+    with ThreadPoolExecutor(
+        max_workers=min(8, os.cpu_count() or 1, len(zone_region_info))
+    ) as executor:
+        futures = [
+            executor.submit(
+                _calculate_containment_in_section,
+                zone,
+                region,
+                section_idx,
+                co2_amounts,
+                location_names,
+                is_in_locations,
+                dates,
+                plume_group_infos,
+                phases,
+            )
+            for zone, region, section_idx in zone_region_info
+        ]
+    containment = [c for future in futures for c in future.result()]
+    logging.info(f"Done calculating contained CO2 {calc_type.name.lower()}")
+    return containment
+
+
+def _calculate_containment_in_section(
+    zone: Optional[str],
+    region: Optional[str],
+    section_idx: Union[slice, np.ndarray],
+    co2_amounts: np.ndarray,
+    location_names: List[str],
+    is_in_locations: np.ndarray,
+    dates: List[str],
+    plume_group_infos: List[Dict],
+    phases: List[str],
+) -> List[ContainedCo2]:
+    """
+    Calculates the amount of CO2 within each location, at each time step, for each
+    plume group and phase, restricted to the grid nodes of a zone / region
+    """
+    # Only the grid nodes of the zone/region are considered from here on
+    co2_amounts_in_section = co2_amounts[..., section_idx]
+    is_in_locations_in_section = is_in_locations[:, section_idx]
+
+    # For each time step and plume group, amounts with shape (phases, locations)
+    amounts_all_plumes = co2_amounts_in_section @ is_in_locations_in_section.T
+    amounts_per_plume: List[Dict[str, np.ndarray]] = []
+    for i, plume_group_info in enumerate(plume_group_infos):
+        amounts_per_plume.append({})
+        for plume_name, is_in_plume in plume_group_info.items():
+            if plume_name == "all":
+                amounts_per_plume[i][plume_name] = amounts_all_plumes[i]
+            else:
+                # Plume groups are usually small, so only their nodes are summed
+                plume_idx = np.flatnonzero(is_in_plume[section_idx])
+                amounts_per_plume[i][plume_name] = (
+                    co2_amounts_in_section[i][:, plume_idx]
+                    @ is_in_locations_in_section[:, plume_idx].T
                 )
 
-                if plume_groups is not None:
-                    plume_group_info = _plume_group_mapping(
-                        plume_names, plume_groups[i]
-                    )
-                else:
-                    plume_group_info = {
-                        "all": np.ones(len(co2_data.x_coord), dtype=bool)
-                    }
-                for plume_name, is_in_plume in plume_group_info.items():
-                    for co2_amount, phase in zip(co2_amounts_for_each_phase, phases):
-                        dtype = (
-                            np.int64
-                            if calc_type == CalculationType.CELL_VOLUME
-                            else np.float64
-                        )
-                        amount = np.sum(
-                            co2_amount[is_in_section & is_in_location & is_in_plume],
-                            dtype=dtype,
+    containment = []
+    for j, location in enumerate(location_names):
+        for date, amounts_at_date in zip(dates, amounts_per_plume):
+            for plume_name, amounts in amounts_at_date.items():
+                for amount, phase in zip(amounts[:, j], phases):
+                    containment.append(
+                        ContainedCo2(
+                            date,
+                            amount,
+                            phase,
+                            location,
+                            zone,
+                            region,
+                            plume_name,
                         )
-                        containment += [
-                            ContainedCo2(
-                                co2_at_timestep.date,
-                                amount,
-                                phase,
-                                location,
-                                zone,
-                                region,
-                                plume_name,
-                            )
-                        ]
-    logging.info(f"Done calculating contained CO2 {calc_type.name.lower()}")
+                    )
     return containment
 
 
@@ -184,39 +262,30 @@ def _make_location_filters(
         logging.info("No hazardous polygon specified.")
 
     # Count as hazardous if the two boundaries overlap:
-    locations["contained"] = np.array(
-        [
-            x if not y else False
-            for x, y in zip(locations["contained"], locations["hazardous"])
-        ]
-    )
-    locations["outside"] = np.array(
-        [
-            not x and not y
-            for x, y in zip(locations["contained"], locations["hazardous"])
-        ]
-    )
+    locations["contained"] = locations["contained"] & ~locations["hazardous"]
+    locations["outside"] = ~(locations["contained"] | locations["hazardous"])
     locations["total"] = np.ones(len(co2_data.x_coord), dtype=bool)
     return locations
 
 
 def _log_summary_of_grid_node_location(locations: Dict) -> None:
+    # The locations are disjoint, so the nodes outside are counted by subtraction
+    n_contained = np.count_nonzero(locations["contained"])
+    n_hazardous = np.count_nonzero(locations["hazardous"])
+    n_total = len(locations["contained"])
     logging.info("Number of grid nodes:")
     logging.info(
-        "  * Inside containment polygon                        :"
-        f"{locations['contained'].sum():>10}"
+        f"  * Inside containment polygon                        :{n_contained:>10}"
     )
     logging.info(
-        "  * Inside hazardous polygon                          :"
-        f"{locations['hazardous'].sum():>10}"
+        f"  * Inside hazardous polygon                          :{n_hazardous:>10}"
     )
     logging.info(
         "  * Outside containment polygon and hazardous polygon :"
-        f"{locations['outside'].sum():>10}"
+        f"{n_total - n_contained - n_hazardous:>10}"
     )
     logging.info(
-        "  * Total                                             :"
-        f"{len(locations['contained']):>10}"
+        f"  * Total                                             :{n_total:>10}"
     )
 
 
@@ -262,16 +331,16 @@ def _lists_of_co2_for_each_phase(
 
 def _zone_map(co2_data: Co2Data, int_to_zone: Optional[List[Optional[str]]]) -> Dict:
     """
-    Returns a dictionary connecting each zone to a boolean array over the grid,
-    indicating whether the grid point belongs to said zone
+    Returns a dictionary connecting each zone to the indices of the grid points
+    belonging to said zone
     """
     if co2_data.zone is None:
         return {}
     elif int_to_zone is None:
-        return {z: np.array(co2_data.zone == z) for z in np.unique(co2_data.zone)}
+        return {z: np.flatnonzero(co2_data.zone == z) for z in np.unique(co2_data.zone)}
     else:
         return {
-            int_to_zone[z]: np.array(co2_data.zone == z)
+            int_to_zone[z]: np.flatnonzero(co2_data.zone == z)
             for z in range(len(int_to_zone))
             if int_to_zone[z] is not None
         }
@@ -281,16 +350,18 @@ def _region_map(
     co2_data: Co2Data, int_to_region: Optional[List[Optional[str]]]
 ) -> Dict:
     """
-    Returns a dictionary connecting each region to a boolean array over the grid,
-    indicating whether the grid point belongs to said region
+    Returns a dictionary connecting each region to the indices of the grid points
+    belonging to said region
     """
     if co2_data.region is None:
         return {}
     elif int_to_region is None:
-        return {r: np.array(co2_data.region == r) for r in np.unique(co2_data.region)}
+        return {
+            r: np.flatnonzero(co2_data.region == r) for r in np.unique(co2_data.region)
+        }
     else:
         return {
-            int_to_region[r]: np.array(co2_data.region == r)
+            int_to_region[r]: np.flatnonzero(co2_data.region == r)
             for r in range(len(int_to_region))
             if int_to_region[r] is not None
         }
@@ -308,26 +379,46 @@ def _zone_and_region_mapping(
     co2_data: Co2Data,
     int_to_zone: Optional[List[Optional[str]]],
     int_to_region: Optional[List[Optional[str]]],
-) -> List:
+) -> List[Tuple[Optional[str], Optional[str], Union[slice, np.ndarray]]]:
     """
     List containing a tuple for each zone / region (and no zone, no region),
-    with the name of the respective zone / region and a boolean array
-    indicating membership of each grid node to the zone / region
+    with the name of the respective zone / region and the indices of the grid
+    nodes belonging to the zone / region. All grid nodes, and zones / regions
+    covering a contiguous range of nodes, are selected by a slice, such that
+    arrays indexed by it are views rather than copies.
     """
     zone_map = _zone_map(co2_data, int_to_zone)
     region_map = _region_map(co2_data, int_to_region)
     return (
-        [(None, None, np.ones(len(co2_data.x_coord), dtype=bool))]
-        + [(zone, None, is_in_zone) for zone, is_in_zone in zone_map.items()]
-        + [(None, region, is_in_region) for region, is_in_region in region_map.items()]
+        [(None, None, slice(None))]
+        + [
+            (zone, None, _as_slice_if_contiguous(zone_idx))
+            for zone, zone_idx in zone_map.items()
+        ]
+        + [
+            (None, region, _as_slice_if_contiguous(region_idx))
+            for region, region_idx in region_map.items()
+        ]
     )
 
 
+def _as_slice_if_contiguous(indices: np.ndarray) -> Union[slice, np.ndarray]:
+    """
+    Returns a slice equivalent to the sorted indices if they form a contiguous
+    range, otherwise the indices unchanged
+    """
+    if len(indices) > 0 and indices[-1] - indices[0] == len(indices) - 1:
+        return slice(int(indices[0]), int(indices[-1]) + 1)
+    return indices
+
+
 def _calculate_containment(
     x_coord: np.ndarray, y_coord: np.ndarray, poly: Union[Polygon, MultiPolygon]
 ) -> np.ndarray:
     """
-    Determines if (x,y) coordinates belong to a given polygon.
+    Determines if (x,y) coordinates belong to a given polygon. The coordinates
+    are expected as contiguous float64 arrays (see Co2Data), so they are passed
+    to shapely without conversion.
 
     Args:
         x_coord (np.ndarray): x coordinates
@@ -338,4 +429,26 @@ def _calculate_containment(
     Returns:
         np.ndarray
     """
-    return np.array([poly.contains(Point(_x, _y)) for _x, _y in zip(x_coord, y_coord)])
+    # Coordinates outside the bounding box of the polygon are rejected without
+    # testing them against the polygon itself
+    min_x, min_y, max_x, max_y = poly.bounds
+    in_bounds = (
+        (x_coord >= min_x)
+        & (x_coord <= max_x)
+        & (y_coord >= min_y)
+        & (y_coord <= max_y)
+    )
+    is_contained = np.zeros(len(x_coord), dtype=bool)
+    if not hasattr(shapely, "contains_xy"):
+        # Shapely < 2.0
+        # pylint: disable-next=import-outside-toplevel
+        from shapely.vectorized import contains
+
+        is_contained[in_bounds] = contains(poly, x_coord[in_bounds], y_coord[in_bounds])
+        return is_contained
+    # Preparing builds the spatial index of the polygon once for all points
+    shapely.prepare(poly)
+    is_contained[in_bounds] = shapely.contains_xy(
+        poly, x_coord[in_bounds], y_coord[in_bounds]
+    )
+    return is_contained
@@ -2,7 +2,7 @@
 """Methods for CO2 containment calculations"""
 import copy
 import logging
-from dataclasses import dataclass, fields, make_dataclass
+from dataclasses import dataclass, field, fields, make_dataclass
 from enum import Enum
 from typing import Any, Dict, List, Literal, Optional, Tuple
 
@@ -124,13 +124,20 @@ class Co2DataAtTimeStep:
     volume_coverage: np.ndarray
     trapped_gas_phase: np.ndarray
     free_gas_phase: np.ndarray
+    _total_mass: Optional[np.ndarray] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def total_mass(self) -> np.ndarray:
         """
         Computes total mass as the sum of gas in dissolved and gas
-        phase.
+        phase. The sum is only computed on the first call.
         """
-        return self.dis_water_phase + self.gas_phase + self.dis_oil_phase
+        if self._total_mass is None:
+            self._total_mass = (
+                self.dis_water_phase + self.gas_phase + self.dis_oil_phase
+            )
+        return self._total_mass
 
 
 @dataclass
@@ -157,6 +164,15 @@ class Co2Data:
     zone: Optional[np.ndarray] = None
     region: Optional[np.ndarray] = None
 
+    def __post_init__(self):
+        """
+        Stores the coordinates as contiguous float64 arrays, the layout expected
+        by the vectorized polygon containment. No copy is made if the
+        coordinates already have this layout.
+        """
+        self.x_coord = np.ascontiguousarray(self.x_coord, dtype=np.float64)
+        self.y_coord = np.ascontiguousarray(self.y_coord, dtype=np.float64)
+
 
 @dataclass
 class ZoneInfo:
@@ -313,10 +329,11 @@ def _identify_gas_less_cells(sgas: dict, dissolved_prop: dict) -> np.ndarray:
       np.ndarray
 
     """
-    gas_less = np.logical_and.reduce([np.abs(sgas[s]) < TRESHOLD_GAS for s in sgas])
-    gas_less &= np.logical_and.reduce(
-        [np.abs(dissolved_prop[a]) < TRESHOLD_DISSOLVED for a in dissolved_prop]
-    )
+    # Accumulate into a single mask, instead of stacking one mask per date
+    gas_less = np.ones(next(iter(sgas.values())).shape, dtype=bool)
+    for prop, threshold in ((sgas, TRESHOLD_GAS), (dissolved_prop, TRESHOLD_DISSOLVED)):
+        for values in prop.values():
+            gas_less &= np.abs(values) < threshold
     return gas_less
 
 
@@ -480,9 +497,8 @@ def _process_zones(
     else:
         logging.info("Using zone info")
         if zone_info.zranges is not None:
-            zone_array = np.zeros(
-                (grid.get_nx(), grid.get_ny(), grid.get_nz()), dtype=int
-            )
+            # Zone of each layer, looked up from the layer of each active cell
+            layer_zone = np.zeros(grid.get_nz(), dtype=int)
             zonevals = [int(x) for x in range(len(zone_info.zranges))]
             zone_info.int_to_zone = [f"Zone_{x}" for x in range(len(zonevals))]
             for zv, zr, zn in zip(
@@ -490,9 +506,9 @@ def _process_zones(
                 list(zone_info.zranges.values()),
                 zone_info.zranges.keys(),
             ):
-                zone_array[:, :, zr[0] - 1 : zr[1]] = zv
+                layer_zone[zr[0] - 1 : zr[1]] = zv
                 zone_info.int_to_zone[zv] = zn
-            zone = zone_array.flatten(order="F")[global_active_idx]
+            zone = layer_zone[global_active_idx // (grid.get_nx() * grid.get_ny())]
         else:
             xtg_grid = xtgeo.grid_from_file(grid_file)
             _check_grid_dimensions(
@@ -1537,7 +1553,7 @@ def _calculate_co2_data_from_source_data(
             for x in source_data.DATES
         }
         vols_ext = {
-            t: np.array([0] * len(source_data.VOL[t])) for t in source_data.DATES
+            t: np.zeros(len(source_data.VOL[t]), dtype=int) for t in source_data.DATES
         }
         for date in source_data.DATES:
             vols_ext[date][~inactive_gas_cells[date]] = np.array(source_data.VOL[date])[
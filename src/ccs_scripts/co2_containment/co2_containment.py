@@ -232,7 +232,7 @@ def _read_polygon(polygon_file: str) -> shapely.geometry.Polygon:
     Returns:
         shapely.geometry.Polygon
     """
-    poly_xy = np.genfromtxt(polygon_file, skip_header=1, delimiter=",")[:, :2]
+    poly_xy = pd.read_csv(polygon_file, usecols=[0, 1], dtype=np.float64).to_numpy()
     return shapely.geometry.Polygon(poly_xy)
 
 
@@ -248,13 +248,18 @@ def _construct_containment_table(
     Returns:
         pd.DataFrame
     """
-    records = [dataclasses.asdict(c) for c in contained_co2]
-    return pd.DataFrame.from_records(records)
+    # Built column by column, as dataclasses.asdict() deep copies every object
+    columns = [field.name for field in dataclasses.fields(ContainedCo2)]
+    return pd.DataFrame(
+        {column: [getattr(c, column) for c in contained_co2] for column in columns}
+    )
 
 
-# pylint: disable-msg=too-many-locals
 def _merge_date_rows(
-    data_frame: pd.DataFrame, calc_type: CalculationType, residual_trapping: bool
+    data_frame: pd.DataFrame,
+    calc_type: CalculationType,
+    residual_trapping: bool,
+    group: Optional[str] = None,
 ) -> pd.DataFrame:
     """
     Uses input dataframe to calculate various new columns and renames/merges
@@ -264,73 +269,45 @@ def _merge_date_rows(
         data_frame (pd.DataFrame): Input data frame
         calc_type (CalculationType): Choose mass / cell_volume /
             actual_volume from enum CalculationType
+        group (str): Column (e.g. zone) to merge the rows of each value of
+            separately. The rows are sorted by this column, then by date.
 
     Returns:
         pd.DataFrame: Output data frame
     """
-    data_frame = data_frame.drop(
-        columns=["zone", "region", "plume_group"], axis=1, errors="ignore"
-    )
     locations = ["contained", "outside", "hazardous"]
+    index = ["date"] if group is None else [group, "date"]
+    # Output column names, and the column of each in the pivoted amounts
+    columns: Dict[str, Union[str, Tuple[str, str]]]
+    # Amounts with one row per date and one column per containment (and phase)
     if calc_type == CalculationType.CELL_VOLUME:
-        total_df = (
-            data_frame[data_frame["containment"] == "total"]
-            .drop(["phase", "containment"], axis=1)
-            .rename(columns={"amount": "total"})
-        )
-        for location in locations:
-            _df = (
-                data_frame[data_frame["containment"] == location]
-                .drop(columns=["phase", "containment"])
-                .rename(columns={"amount": f"total_{location}"})
-            )
-            total_df = total_df.merge(_df, on="date", how="left")
+        amounts = data_frame.pivot(index=index, columns="containment", values="amount")
+        columns = {"total": "total"}
+        columns.update({f"total_{location}": location for location in locations})
     else:
-        total_df = (
-            data_frame[
-                (data_frame["phase"] == "total")
-                & (data_frame["containment"] == "total")
-            ]
-            .drop(["phase", "containment"], axis=1)
-            .rename(columns={"amount": "total"})
+        amounts = data_frame.pivot(
+            index=index, columns=["containment", "phase"], values="amount"
         )
         phases = ["free_gas", "trapped_gas"] if residual_trapping else ["gas"]
         phases += ["dissolved"]
+        columns = {"total": ("total", "total")}
         # Total by phase
-        for phase in phases:
-            _df = (
-                data_frame[
-                    (data_frame["containment"] == "total")
-                    & (data_frame["phase"] == phase)
-                ]
-                .drop(columns=["phase", "containment"])
-                .rename(columns={"amount": f"total_{phase}"})
-            )
-            total_df = total_df.merge(_df, on="date", how="left")
+        columns.update({f"total_{phase}": ("total", phase) for phase in phases})
         # Total by containment
-        for location in locations:
-            _df = (
-                data_frame[
-                    (data_frame["containment"] == location)
-                    & (data_frame["phase"] == "total")
-                ]
-                .drop(columns=["phase", "containment"])
-                .rename(columns={"amount": f"total_{location}"})
-            )
-            total_df = total_df.merge(_df, on="date", how="left")
-        # Total by containment
-        for location in locations:
-            for phase in phases:
-                _df = (
-                    data_frame[
-                        (data_frame["containment"] == location)
-                        & (data_frame["phase"] == phase)
-                    ]
-                    .drop(columns=["phase", "containment"])
-                    .rename(columns={"amount": f"{phase}_{location}"})
-                )
-                total_df = total_df.merge(_df, on="date", how="left")
-    return total_df.reset_index(drop=True)
+        columns.update(
+            {f"total_{location}": (location, "total") for location in locations}
+        )
+        # By containment and phase
+        columns.update(
+            {
+                f"{phase}_{location}": (location, phase)
+                for location in locations
+                for phase in phases
+            }
+        )
+    total_df = amounts.reindex(columns=list(columns.values()))
+    total_df.columns = list(columns.keys())
+    return total_df.reset_index()
 
 
 def str_to_bool(value):
@@ -465,36 +442,24 @@ def get_parser() -> argparse.ArgumentParser:
 
 
 def _replace_default_dummies_from_ert(args):
-    if args.root_dir == "-1":
-        args.root_dir = None
-    if args.egrid == "-1":
-        args.egrid = None
-    if args.unrst == "-1":
-        args.unrst = None
-    if args.init == "-1":
-        args.init = None
-    if args.out_dir == "-1":
-        args.out_dir = None
-    if args.zonefile == "-1":
-        args.zonefile = None
-    if args.regionfile == "-1":
-        args.regionfile = None
-    if args.region_property == "-1":
-        args.region_property = None
-    if args.containment_polygon == "-1":
-        args.containment_polygon = None
-    if args.hazardous_polygon == "-1":
-        args.hazardous_polygon = None
-    if args.no_logging == "-1":
-        args.no_logging = False
-    if args.debug == "-1":
-        args.debug = False
-    if args.residual_trapping == "-1":
-        args.residual_trapping = False
-    if args.readable_output == "-1":
-        args.readable_output = False
-    if args.gas_molar_mass == "-1":
-        args.gas_molar_mass = None
+    for name in (
+        "root_dir",
+        "egrid",
+        "unrst",
+        "init",
+        "out_dir",
+        "zonefile",
+        "regionfile",
+        "region_property",
+        "containment_polygon",
+        "hazardous_polygon",
+        "gas_molar_mass",
+    ):
+        if getattr(args, name) == "-1":
+            setattr(args, name, None)
+    for name in ("no_logging", "debug", "residual_trapping", "readable_output"):
+        if getattr(args, name) == "-1":
+            setattr(args, name, False)
 
 
 class InputError(Exception):
@@ -644,7 +609,10 @@ def process_zonefile_if_yaml(zonefile: str) -> Optional[Dict[str, List[int]]]:
     if zonefile.split(".")[-1].lower() in ["yml", "yaml"]:
         with open(zonefile, "r", encoding="utf8") as stream:
             try:
-                zfile = yaml.safe_load(stream)
+                # The C loader (libyaml) is used when PyYAML is built with it
+                zfile = yaml.load(
+                    stream, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+                )
             except yaml.YAMLError as exc:
                 logging.error(exc)
                 sys.exit(1)
@@ -652,13 +620,7 @@ def process_zonefile_if_yaml(zonefile: str) -> Optional[Dict[str, List[int]]]:
             error_text = "The yaml zone file must be in the format:\nzranges:\
             \n    - Zone1: [1, 5]\n    - Zone2: [6, 10]\n    - Zone3: [11, 14])"
             raise InputError(error_text)
-        zranges = zfile["zranges"]
-        if len(zranges) > 1:
-            zranges_ = zranges[0]
-            for zr in zranges[1:]:
-                zranges_.update(zr)
-            zranges = zranges_
-        return zranges
+        return {zone: layers for zr in zfile["zranges"] for zone, layers in zr.items()}
     return None
 
 
@@ -745,65 +707,69 @@ def log_summary_of_results(
     Log a rough summary of the output
     """
     cell_volume = calc_type_input == "cell_volume"
-    dfs = df.sort_values("date")
-    last_date = max(df["date"])
-    df_subset = dfs[dfs["date"] == last_date]
-    df_subset = df_subset[
-        (df_subset["zone"] == "all")
-        & (df_subset["region"] == "all")
-        & (df_subset["plume_group"] == "all")
+    first_date = df["date"].min()
+    last_date = df["date"].max()
+    df_subset = df[
+        (df["date"] == last_date)
+        & (df["zone"] == "all")
+        & (df["region"] == "all")
+        & (df["plume_group"] == "all")
     ]
-    total = extract_amount(df_subset, "total", "total", cell_volume)
+    # Amounts at the last date by containment and phase, 0.0 where missing. For
+    # cell volume there is a single phase, looked up with phase "total".
+    phases = ["total"] * len(df_subset) if cell_volume else df_subset["phase"]
+    end_amounts = dict(zip(zip(df_subset["containment"], phases), df_subset["amount"]))
+    total = end_amounts.get(("total", "total"), 0.0)
     n = len(f"{total:.1f}")
 
     col1 = 24
     logging.info("\nSummary of results:")
     logging.info("===================")
-    logging.info(f"{'Number of dates':<{col1}} : {len(dfs['date'].unique())}")
-    logging.info(f"{'First date':<{col1}} : {dfs['date'].iloc[0]}")
-    logging.info(f"{'Last date':<{col1}} : {dfs['date'].iloc[-1]}")
+    logging.info(f"{'Number of dates':<{col1}} : {df['date'].nunique()}")
+    logging.info(f"{'First date':<{col1}} : {first_date}")
+    logging.info(f"{'Last date':<{col1}} : {last_date}")
     logging.info(f"{'End state total':<{col1}} : {total:{n}.1f}")
     if not cell_volume:
-        if "gas" in list(df_subset["phase"]):
-            value = extract_amount(df_subset, "total", "gas")
+        if ("total", "gas") in end_amounts:
+            value = end_amounts.get(("total", "gas"), 0.0)
             percent = 100.0 * value / total if total > 0.0 else 0.0
             logging.info(
                 f"{'End state gaseous':<{col1}} : "
                 f"{value:{n}.1f}  ={percent:>5.1f} %"
             )
         else:
-            value = extract_amount(df_subset, "total", "free_gas")
+            value = end_amounts.get(("total", "free_gas"), 0.0)
             percent = 100.0 * value / total if total > 0.0 else 0.0
             logging.info(
                 f"{'End state free gas':<{col1}} : "
                 f"{value:{n}.1f}  ={percent:>5.1f} %"
             )
-            value = extract_amount(df_subset, "total", "trapped_gas")
+            value = end_amounts.get(("total", "trapped_gas"), 0.0)
             percent = 100.0 * value / total if total > 0.0 else 0.0
             logging.info(
                 f"{'End state trapped gas':<{col1}} : "
                 f"{value:{n}.1f}  ={percent:>5.1f} %"
             )
-        value = extract_amount(df_subset, "total", "dissolved")
+        value = end_amounts.get(("total", "dissolved"), 0.0)
         percent = 100.0 * value / total if total > 0.0 else 0.0
         logging.info(
             f"{'End state dissolved':<{col1}} : {value:{n}.1f}  ={percent:>5.1f} %"
         )
-    value = extract_amount(df_subset, "contained", "total", cell_volume)
+    value = end_amounts.get(("contained", "total"), 0.0)
     percent = 100.0 * value / total if total > 0.0 else 0.0
     logging.info(
         f"{'End state contained':<{col1}} : {value:{n}.1f}  ={percent:>5.1f} %"
     )
-    value = extract_amount(df_subset, "outside", "total", cell_volume)
+    value = end_amounts.get(("outside", "total"), 0.0)
     percent = 100.0 * value / total if total > 0.0 else 0.0
     logging.info(f"{'End state outside':<{col1}} : {value:{n}.1f}  ={percent:>5.1f} %")
-    value = extract_amount(df_subset, "hazardous", "total", cell_volume)
+    value = end_amounts.get(("hazardous", "total"), 0.0)
     percent = 100.0 * value / total if total > 0.0 else 0.0
     logging.info(
         f"{'End state hazardous':<{col1}} : {value:{n}.1f}  ={percent:>5.1f} %"
     )
-    if "zone" in dfs:
-        unique_zones = set(dfs["zone"].unique())
+    if "zone" in df:
+        unique_zones = set(df["zone"].unique())
         unique_zones.discard("all")
         if len(unique_zones) == 0:
             logging.info(f"{'Split into zones?':<{col1}} : no")
@@ -813,8 +779,8 @@ def log_summary_of_results(
             logging.info(f"{'Zones':<{col1}} : {', '.join(unique_zones)}")
     else:
         logging.info(f"{'Split into zones?':<{col1}} : no")
-    if "region" in dfs:
-        unique_regions = set(dfs["region"].unique())
+    if "region" in df:
+        unique_regions = set(df["region"].unique())
         unique_regions.discard("all")
         if len(unique_regions) == 0:
             logging.info(f"{'Split into regions?':<{col1}} : no")
@@ -824,8 +790,8 @@ def log_summary_of_results(
             logging.info(f"{'Regions':<{col1}} : {', '.join(unique_regions)}")
     else:
         logging.info("{'Split into regions?':<{col1}} : no")
-    if "plume_group" in dfs:
-        unique_plumes = set(dfs["plume_group"].unique())
+    if "plume_group" in df:
+        unique_plumes = set(df["plume_group"].unique())
         unique_plumes.discard("all")
         unique_plumes.discard("undetermined")
         if len(unique_plumes) == 0:
@@ -836,33 +802,22 @@ def log_summary_of_results(
             logging.info(f"{'Plume groups':<{col1}} : {', '.join(unique_plumes)}")
 
 
-def extract_amount(
-    df: pd.DataFrame,
-    c: str,
-    p: str,
-    cv: Optional[bool] = False,
-    ind: int = -1,
-) -> float:
-    """
-    Return the total co2 amount in grid nodes with the specified to phase and location
-    at the latest recorded date (or at a specified index 'ind')
-    """
-    if cv:
-        return df[df["containment"] == c]["amount"].iloc[ind]
-    return df[(df["containment"] == c) & (df["phase"] == p)]["amount"].iloc[ind]
-
-
 def sort_and_replace_nones(
     data_frame: pd.DataFrame,
 ):
     """
     Replaces empty zone and region fields with "all", and sorts the data frame
     """
-    data_frame.replace(to_replace=[None], value="AAAAAll", inplace=True)
-    data_frame.replace(to_replace=["total"], value="AAAAtotal", inplace=True)
-    data_frame.sort_values(by=list(data_frame.columns[-1:1:-1]), inplace=True)
-    data_frame.replace(to_replace=["AAAAtotal"], value="total", inplace=True)
-    data_frame.replace(to_replace=["AAAAAll"], value="all", inplace=True)
+    sort_columns = list(data_frame.columns[-1:1:-1])
+    data_frame.sort_values(by=sort_columns, key=_sort_key, inplace=True)
+    data_frame[sort_columns] = data_frame[sort_columns].fillna("all")
+
+
+def _sort_key(values: pd.Series) -> pd.Series:
+    """
+    Sort key ordering empty fields as "AAAAAll" and "total" as "AAAAtotal"
+    """
+    return values.fillna("AAAAAll").replace({"total": "AAAAtotal"})
 
 
 def convert_data_frame(
@@ -877,74 +832,82 @@ def convert_data_frame(
     """
     calc_type = _set_calc_type_from_input_string(calc_type_input)
     logging.info("\nMerge data rows for data frame")
+    # Masks shared by the filters below
+    all_plume_groups = data_frame["plume_group"] == "all"
+    all_zones_and_regions = (data_frame["zone"] == "all") & (
+        data_frame["region"] == "all"
+    )
     total_df = _merge_date_rows(
-        data_frame[
-            (data_frame["zone"] == "all")
-            & (data_frame["region"] == "all")
-            & (data_frame["plume_group"] == "all")
-        ],
+        data_frame[all_zones_and_regions & all_plume_groups],
         calc_type,
         residual_trapping,
     )
-    total_df["zone"] = ["all"] * total_df.shape[0]
-    total_df["region"] = ["all"] * total_df.shape[0]
-    total_df["plume_group"] = ["all"] * total_df.shape[0]
+    total_df["zone"] = "all"
+    total_df["region"] = "all"
+    total_df["plume_group"] = "all"
 
     zone_df = pd.DataFrame()
     if int_to_zone is not None:
         zones = [z for z in int_to_zone if z is not None]
-        for z in zones:
-            _df = _merge_date_rows(
-                data_frame[
-                    (data_frame["zone"] == z) & (data_frame["plume_group"] == "all")
-                ],
-                calc_type,
-                residual_trapping,
-            )
-            _df["zone"] = [z] * _df.shape[0]
-            zone_df = pd.concat([zone_df, _df])
-        zone_df["region"] = ["all"] * zone_df.shape[0]
-        zone_df["plume_group"] = ["all"] * zone_df.shape[0]
+        zone_df = _merge_date_rows(
+            data_frame[data_frame["zone"].isin(zones) & all_plume_groups],
+            calc_type,
+            residual_trapping,
+            group="zone",
+        )
+        zone_df = _sort_by_name_order(zone_df, "zone", zones)
+        zone_df["region"] = "all"
+        zone_df["plume_group"] = "all"
 
     region_df = pd.DataFrame()
     if int_to_region is not None:
         regions = [r for r in int_to_region if r is not None]
-        for r in regions:
-            _df = _merge_date_rows(
-                data_frame[
-                    (data_frame["region"] == r) & (data_frame["plume_group"] == "all")
-                ],
-                calc_type,
-                residual_trapping,
-            )
-            _df["region"] = [r] * _df.shape[0]
-            region_df = pd.concat([region_df, _df])
-        region_df["zone"] = ["all"] * region_df.shape[0]
-        region_df["plume_group"] = ["all"] * region_df.shape[0]
+        region_df = _merge_date_rows(
+            data_frame[data_frame["region"].isin(regions) & all_plume_groups],
+            calc_type,
+            residual_trapping,
+            group="region",
+        )
+        region_df = _sort_by_name_order(region_df, "region", regions)
+        region_df["zone"] = "all"
+        region_df["plume_group"] = "all"
 
     plume_groups_df = pd.DataFrame()
     plume_groups = list(pd.unique(data_frame["plume_group"]))
     plume_groups = [name for name in plume_groups if name not in ["all"]]
     if len(plume_groups) > 0:
+        plume_group_dfs = []
         for p in plume_groups:
             _df = _merge_date_rows(
-                data_frame[
-                    (data_frame["plume_group"] == p)
-                    & (data_frame["zone"] == "all")
-                    & (data_frame["region"] == "all")
-                ],
+                data_frame[(data_frame["plume_group"] == p) & all_zones_and_regions],
                 calc_type,
                 residual_trapping,
             )
-            _df["plume_group"] = [p] * _df.shape[0]
-            plume_groups_df = pd.concat([plume_groups_df, _df])
-        plume_groups_df["zone"] = ["all"] * plume_groups_df.shape[0]
-        plume_groups_df["region"] = ["all"] * plume_groups_df.shape[0]
-
-    combined_df = pd.concat([total_df, zone_df, region_df, plume_groups_df])
+            _df["plume_group"] = p
+            plume_group_dfs.append(_df)
+        plume_groups_df = pd.concat(plume_group_dfs, ignore_index=True)
+        plume_groups_df["zone"] = "all"
+        plume_groups_df["region"] = "all"
+
+    combined_df = pd.concat(
+        [total_df, zone_df, region_df, plume_groups_df], ignore_index=True
+    )
     return combined_df
 
 
+def _sort_by_name_order(
+    data_frame: pd.DataFrame, column: str, names: List[str]
+) -> pd.DataFrame:
+    """
+    Sorts the rows by the position of their value of the given column in a list of
+    names. The order of rows with the same value is kept.
+    """
+    position = {name: i for i, name in enumerate(names)}
+    return data_frame.sort_values(
+        column, key=lambda values: values.map(position), kind="stable"
+    )
+
+
 def export_output_to_csv(
     out_dir: str,
     calc_type_input: str,
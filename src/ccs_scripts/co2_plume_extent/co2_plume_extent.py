@@ -4,6 +4,7 @@ Calculates the plume extent from a given coordinate, or well point,
 using SGAS and the dissolved property (AMFG/XMF2).
 """
 import argparse
+import functools
 import getpass
 import logging
 import os
@@ -28,6 +29,7 @@ from ccs_scripts.co2_containment.co2_containment import str_to_bool
 from ccs_scripts.co2_plume_tracking.co2_plume_tracking import calculate_plume_groups
 from ccs_scripts.co2_plume_tracking.utils import (
     InjectionWellData,
+    active_cell_centers,
     assemble_plume_groups_into_dict,
     sort_well_names,
 )
@@ -35,6 +37,7 @@ from ccs_scripts.co2_plume_tracking.utils import (
 DEFAULT_THRESHOLD_GAS = 0.2
 DEFAULT_THRESHOLD_DISSOLVED = 0.0005
 INJ_POINT_THRESHOLD = 60.0
+WELL_PICKS_COLUMNS = ("WELL", "X_UTME", "Y_UTMN", "MD", "HORIZON")
 
 DESCRIPTION = """
 Calculates the maximum lateral distance of the CO2 plume from a given location,
@@ -409,19 +412,19 @@ class Configuration:
         else:
             p2 = Path(well_picks_path)
 
-        df = pd.read_csv(p2)
+        df = _read_well_picks(str(p2))
         logging.info("Done reading well picks CSV file")
         logging.debug("Well picks read from CSV file:")
         logging.debug(df)
 
-        if well_name not in list(df["WELL"]):
+        df = df[df["WELL"] == well_name]
+        if len(df) == 0:
             logging.error(
                 f"No matches for well name {well_name}, input is either mistyped "
                 "or well does not exist."
             )
             sys.exit(1)
 
-        df = df[df["WELL"] == well_name]
         logging.info(f"Number of well picks for well {well_name}: {len(df)}")
         logging.info("Using the well pick with the largest measured depth.")
 
@@ -620,41 +623,32 @@ def _log_distance_calculation_configurations(config: Configuration) -> None:
 
 def _calculate_grid_cell_distances(
     inj_wells: Optional[List[InjectionWellData]],
-    nactive: int,
+    centers: np.ndarray,
     calculation_type: CalculationType,
-    grid: Grid,
     config: Calculation,
 ):
+    xs = centers[:, 0]
+    ys = centers[:, 1]
     dist = {}
     if calculation_type == CalculationType.PLUME_EXTENT:
         if inj_wells is None or len(inj_wells) == 0:
             # Also needed when no config file is used
             x0 = config.x
             y0 = config.y
-            dist["WELL"] = np.zeros(shape=(nactive,))
-            for i in range(nactive):
-                center = grid.get_xyz(active_index=i)
-                dist["WELL"][i] = np.sqrt((center[0] - x0) ** 2 + (center[1] - y0) ** 2)
+            dist["WELL"] = np.sqrt((xs - x0) ** 2 + (ys - y0) ** 2)
         else:
-            for well in inj_wells:
-                name = well.name
-                x0 = well.x
-                y0 = well.y
-                dist[name] = np.zeros(shape=(nactive,))
-                for i in range(nactive):
-                    center = grid.get_xyz(active_index=i)
-                    dist[well.name][i] = np.sqrt(
-                        (center[0] - x0) ** 2 + (center[1] - y0) ** 2
-                    )
+            # Distances from all wells in one operation, shape (wells, cells).
+            # Each well refers to its own row of this array.
+            wells_x = np.array([[well.x] for well in inj_wells])
+            wells_y = np.array([[well.y] for well in inj_wells])
+            dist_wells = np.sqrt((xs - wells_x) ** 2 + (ys - wells_y) ** 2)
+            for well, well_dist in zip(inj_wells, dist_wells):
+                dist[well.name] = well_dist
     elif calculation_type == CalculationType.POINT:
-        dist["ALL"] = np.zeros(shape=(nactive,))
         x0 = config.x
         y0 = config.y
-        for i in range(nactive):
-            center = grid.get_xyz(active_index=i)
-            dist["ALL"][i] = np.sqrt((center[0] - x0) ** 2 + (center[1] - y0) ** 2)
+        dist["ALL"] = np.sqrt((xs - x0) ** 2 + (ys - y0) ** 2)
     elif calculation_type == CalculationType.LINE:
-        dist["ALL"] = np.zeros(shape=(nactive,))
         line_value = config.x
         ind = 0  # Use x-coordinate
         if config.direction in (LineDirection.NORTH, LineDirection.SOUTH):
@@ -665,10 +659,8 @@ def _calculate_grid_cell_distances(
         if config.direction in (LineDirection.WEST, LineDirection.SOUTH):
             factor = -1
 
-        for i in range(nactive):
-            center = grid.get_xyz(active_index=i)
-            dist["ALL"][i] = factor * (line_value - center[ind])
-        dist["ALL"][dist["ALL"] < 0] = 0.0
+        # Zero distance for grid cells on the other side of the line
+        dist["ALL"] = np.maximum(factor * (line_value - centers[:, ind]), 0.0)
 
     text = ""
     if calculation_type == CalculationType.PLUME_EXTENT:
@@ -680,14 +672,13 @@ def _calculate_grid_cell_distances(
     for inj_well, distance in dist.items():
         logging.info(f"Injection well: {inj_well}")
         logging.info(
-            f"    Smallest distance grid cell to {text} : {min(distance):>10.1f}"
+            f"    Smallest distance grid cell to {text} : {distance.min():>10.1f}"
         )
         logging.info(
-            f"    Largest distance grid cell to {text}  : {max(distance):>10.1f}"
+            f"    Largest distance grid cell to {text}  : {distance.max():>10.1f}"
         )
         logging.info(
-            f"    Average distance grid cell to {text}  : "
-            f"{sum(distance) / len(distance):>10.1f}"
+            f"    Average distance grid cell to {text}  : {distance.mean():>10.1f}"
         )
     logging.info("")
 
@@ -695,8 +686,7 @@ def _calculate_grid_cell_distances(
 
 
 def calculate_single_distances(
-    nactive: int,
-    grid: Grid,
+    centers: np.ndarray,
     unrst: ResdataFile,
     threshold_gas: float,
     threshold_dissolved: float,
@@ -708,9 +698,7 @@ def calculate_single_distances(
     calculation_type = config.type
 
     # Calculate distance from point/line to center of all cells
-    dist = _calculate_grid_cell_distances(
-        inj_wells, nactive, calculation_type, grid, config
-    )
+    dist = _calculate_grid_cell_distances(inj_wells, centers, calculation_type, config)
 
     gas_results = _find_distances_per_time_step(
         "SGAS",
@@ -799,13 +787,14 @@ def calculate_distances(
 
     nactive = grid.get_num_active()
     logging.info(f"Number of active grid cells: {nactive}")
+    # Centers of the active grid cells, shared by all distance calculations
+    centers = active_cell_centers(grid)
 
     all_results = []
     for i, single_config in enumerate(distance_calculations, 1):
         logging.info(f"\nCalculating distances for configuration number: {i}\n")
         (a, b, c) = calculate_single_distances(
-            nactive,
-            grid,
+            centers,
             unrst,
             threshold_gas,
             threshold_dissolved,
@@ -891,11 +880,6 @@ def _find_distances_at_time_step(
     # This argument will be updated:
     dist_per_group: Dict[str, Dict[str, np.ndarray]],
 ):
-    # NBNB-AS: Only needed if plume tracking is deactivated?
-    #          If not, we have already done this
-    data = unrst[attribute_key][i].numpy_view()
-    cells_with_co2 = np.where(data > threshold)[0]
-
     if calculation_type == CalculationType.PLUME_EXTENT:
         if do_plume_tracking and plume_groups is not None:
             pg_dict = assemble_plume_groups_into_dict(plume_groups)
@@ -920,6 +904,7 @@ def _find_distances_at_time_step(
                 dist_per_group["ALL"] = {}
                 for well_name in dist.keys():
                     dist_per_group["ALL"][well_name] = np.zeros(shape=(n_time_steps,))
+            cells_with_co2 = _find_cells_with_co2(unrst, attribute_key, i, threshold)
             for well_name in dist.keys():
                 if len(cells_with_co2) > 0:
                     dist_per_group["ALL"][well_name][i] = dist[well_name][
@@ -950,12 +935,24 @@ def _find_distances_at_time_step(
                 dist_per_group["ALL"] = {}
                 for well_name in dist.keys():
                     dist_per_group["ALL"][well_name] = np.full(n_time_steps, np.nan)
+            cells_with_co2 = _find_cells_with_co2(unrst, attribute_key, i, threshold)
             if len(cells_with_co2) > 0:
                 dist_per_group["ALL"]["ALL"][i] = dist["ALL"][cells_with_co2].min()
             else:
                 dist_per_group["ALL"]["ALL"][i] = np.nan
 
 
+def _find_cells_with_co2(
+    unrst: ResdataFile, attribute_key: str, i: int, threshold: float
+) -> np.ndarray:
+    """
+    Active indices of the grid cells where the property exceeds the threshold.
+    Not needed with plume tracking, as the cells of each plume group are known.
+    """
+    data = unrst[attribute_key][i].numpy_view()
+    return np.flatnonzero(data > threshold)
+
+
 def _organize_output_with_dates(
     dist_per_group: Dict[str, Dict[str, np.ndarray]],
     calculation_type: CalculationType,
@@ -1080,7 +1077,9 @@ def _collect_results_into_dataframe(
     injection_wells: Optional[List[InjectionWellData]] = None,
 ) -> pd.DataFrame:
     dates = _find_dates(all_results)
-    df = pd.DataFrame.from_records(dates, columns=["date"])
+    # The results are collected as one column per date-indexed frame, and
+    # joined into a single DataFrame at the end
+    frames = [pd.DataFrame.from_records(dates, columns=["date"]).set_index("date")]
     for i, (result, single_config) in enumerate(
         zip(all_results, config.distance_calculations), 1
     ):
@@ -1098,10 +1097,11 @@ def _collect_results_into_dataframe(
                     full_col_name += "_PLUME_" + group_str
                 if well_name != "ALL" and well_name != "WELL":
                     full_col_name += "_FROM_INJ_" + well_name
-                gas_df = pd.DataFrame.from_records(
-                    result2, columns=["date", full_col_name]
+                frames.append(
+                    pd.DataFrame.from_records(
+                        result2, columns=["date", full_col_name]
+                    ).set_index("date")
                 )
-                df = pd.merge(df, gas_df, on="date")
         if dissolved_results is not None:
             if injection_wells is not None and config.do_plume_tracking:
                 dissolved_results_sorted = sort_well_names(
@@ -1117,11 +1117,12 @@ def _collect_results_into_dataframe(
                             full_col_name += "_PLUME_" + group_str
                         if well_name != "ALL" and well_name != "WELL":
                             full_col_name += "_FROM_INJ_" + well_name
-                        dissolved_df = pd.DataFrame.from_records(
-                            result2, columns=["date", full_col_name]
+                        frames.append(
+                            pd.DataFrame.from_records(
+                                result2, columns=["date", full_col_name]
+                            ).set_index("date")
                         )
-                        df = pd.merge(df, dissolved_df, on="date")
-    return df
+    return pd.concat(frames, axis=1, join="inner").reset_index()
 
 
 def _calculate_well_coordinates(
@@ -1159,19 +1160,19 @@ def _calculate_well_coordinates(
     else:
         p2 = Path(well_picks_path)
 
-    df = pd.read_csv(p2)
+    df = _read_well_picks(str(p2))
     logging.info("Done reading well picks CSV file")
     logging.debug("Well picks read from CSV file:")
     logging.debug(df)
 
-    if well_name not in list(df["WELL"]):
+    df = df[df["WELL"] == well_name]
+    if len(df) == 0:
         logging.error(
             f"No matches for well name {well_name}, input is either mistyped "
             "or well does not exist."
         )
         sys.exit(1)
 
-    df = df[df["WELL"] == well_name]
     logging.info(f"Number of well picks for well {well_name}: {len(df)}")
     logging.info("Using the well pick with the largest measured depth.")
 
@@ -1191,6 +1192,26 @@ def _calculate_well_coordinates(
     return (x, y)
 
 
+def _read_well_picks(well_picks_path: str) -> pd.DataFrame:
+    """
+    Reads the well picks CSV file. The file is only parsed once per process, as
+    long as it is not modified (e.g. when the coordinates of several wells are
+    found from the same file).
+    """
+    stat = os.stat(well_picks_path)
+    return _read_well_picks_cached(well_picks_path, stat.st_mtime, stat.st_size).copy()
+
+
+@functools.lru_cache(maxsize=8)
+def _read_well_picks_cached(
+    well_picks_path: str, mtime: float, size: int
+) -> pd.DataFrame:
+    # Only the columns used to find the injection coordinates are parsed
+    return pd.read_csv(
+        well_picks_path, usecols=lambda column: column in WELL_PICKS_COLUMNS
+    )
+
+
 def _find_input_point(injection_point_info: str) -> Tuple[float, float]:
     if (
         len(injection_point_info) > 0
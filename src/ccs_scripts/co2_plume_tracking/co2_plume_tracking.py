@@ -25,8 +25,11 @@ from resdata.grid import Grid
 from resdata.resfile import ResdataFile
 
 from ccs_scripts.co2_plume_tracking.utils import (
+    HAS_CO2,
+    GridIndices,
     InjectionWellData,
     PlumeGroups,
+    _grid_indices,
     assemble_plume_groups_into_dict,
     sort_well_names,
 )
@@ -370,6 +373,7 @@ def calculate_plume_groups(
 
     inj_wells_grid_indices: Dict[str, List[Tuple[int, int, Optional[int]]]] = {}
     _find_inj_wells_grid_indices(inj_wells_grid_indices, grid, inj_wells)
+    grid_indices = _grid_indices(grid)
 
     logging.info(f"\nStart calculating plume tracking for {attribute_key}.\n")
     logging.info(f"Progress ({n_time_steps} time steps):")
@@ -383,6 +387,7 @@ def calculate_plume_groups(
         _plume_groups_at_time_step(
             unrst,
             grid,
+            grid_indices,
             attribute_key,
             i,
             threshold,
@@ -394,8 +399,7 @@ def calculate_plume_groups(
             n_grid_cells_for_logging,
         )
 
-        for j, cell in enumerate(groups.cells):
-            all_groups = cell.all_groups
+        for j, all_groups in enumerate(groups.all_groups):
             if all_groups:
                 group_string = "+".join(
                     [
@@ -409,7 +413,8 @@ def calculate_plume_groups(
                 )
                 pg_prop[i][j] = group_string
 
-        prev_groups = groups.copy()
+        # The groups are not modified after this time step, so no copy is needed
+        prev_groups = groups
         percent = (i + 1) / n_time_steps
         logging.info(f"{percent * 100:>6.1f} %")
     logging.info("")
@@ -428,6 +433,7 @@ def calculate_plume_groups(
 def _plume_groups_at_time_step(
     unrst: ResdataFile,
     grid: Grid,
+    grid_indices: GridIndices,
     attribute_key: str,
     i: int,
     threshold: float,
@@ -442,7 +448,7 @@ def _plume_groups_at_time_step(
     # NBNB-AS: Here we are working on active grid cells,
     #          instead of 'non-gasless' cells, like in containment-script
     data = unrst[attribute_key][i].numpy_view()
-    cells_with_co2 = np.where(data > threshold)[0]
+    cells_with_co2 = np.flatnonzero(data > threshold)
 
     logging.debug("\nPrevious group:")
     prev_groups.debug_print()
@@ -451,6 +457,7 @@ def _plume_groups_at_time_step(
         cells_with_co2,
         prev_groups,
         grid,
+        grid_indices,
         inj_wells,
         inj_wells_grid_indices,
         groups,
@@ -459,31 +466,27 @@ def _plume_groups_at_time_step(
     logging.debug("\nCurrent group after first intialization:")
     groups.debug_print()
 
-    groups_to_merge = groups.resolve_undetermined_cells(grid)
+    groups_to_merge = groups.resolve_undetermined_cells(grid_indices)
     for full_group in groups_to_merge:
-        new_group = [x for y in full_group for x in y]
-        new_group.sort()
-        for cell in groups.cells:
-            if cell.has_co2():
-                for g in full_group:
-                    if set(cell.all_groups) & set(g):
-                        cell.all_groups = new_group
+        new_group = tuple(sorted(x for y in full_group for x in y))
+        for j in np.flatnonzero(groups.has_co2()):
+            for g in full_group:
+                if set(groups.all_groups[j]) & set(g):
+                    groups.all_groups[j] = new_group
 
     logging.debug("\nCurrent group after resolving undetermined cells:")
     groups.debug_print()
 
     unique_groups = groups.find_unique_groups()
     for g in unique_groups:
-        if g == [-1]:
+        if g == (-1,):
             if "undetermined" not in n_grid_cells_for_logging:
                 n_grid_cells_for_logging["undetermined"] = [0] * n_time_steps
             n_grid_cells_for_logging["undetermined"][i] = len(
-                [j for j in cells_with_co2 if groups.cells[j].all_groups == [-1]]
+                [j for j in cells_with_co2 if groups.all_groups[j] == (-1,)]
             )
             continue
-        indices_this_group = [
-            j for j in cells_with_co2 if groups.cells[j].all_groups == g
-        ]
+        indices_this_group = [j for j in cells_with_co2 if groups.all_groups[j] == g]
 
         group_string = "+".join(
             [str([x.name for x in inj_wells if x.number == y][0]) for y in g]
@@ -497,73 +500,89 @@ def _initialize_groups_from_prev_step_and_inj_wells(
     cells_with_co2: np.ndarray,
     prev_groups: PlumeGroups,
     grid: Grid,
+    grid_indices: GridIndices,
     inj_wells: List[InjectionWellData],
     inj_wells_grid_indices: Dict[str, List[Tuple[int, int, Optional[int]]]],
     groups: PlumeGroups,
 ):
     new_z_coords: Dict[str, List[float]] = {}
-    for index in cells_with_co2:
-        if prev_groups.cells[index].has_co2():
-            groups.cells[index] = prev_groups.cells[index]
-        else:
-            # This grid cell did not have CO2 in the last time step
-            (i, j, k) = grid.get_ijk(active_index=index)
-            (x, y, z) = grid.get_xyz(active_index=index)
-            found = False
-            for well in inj_wells:
-                if well.z is not None:
-                    same_cell = any(
-                        [
-                            (i, j, k) == (wi, wj, wk)
-                            for (wi, wj, wk) in inj_wells_grid_indices[well.name]
-                        ]
-                    )
-                    xyz_close = (
-                        abs(x - well.x) <= INJ_POINT_THRESHOLD_LATERAL
-                        and abs(y - well.y) <= INJ_POINT_THRESHOLD_LATERAL
-                        and any(
-                            [
-                                abs(z - well_z) <= INJ_POINT_THRESHOLD_VERTICAL
-                                for well_z in well.z
-                            ]
-                        )
-                    )
+    had_co2 = prev_groups.status[cells_with_co2] == HAS_CO2
+    # Grid cells that had CO2 in the last time step keep their groups
+    carried = cells_with_co2[had_co2]
+    groups.status[carried] = HAS_CO2
+    for index in carried.tolist():
+        groups.all_groups[index] = prev_groups.all_groups[index]
+
+    # Group of each injection well, found when first needed. Grid cells close
+    # to a well are only given groups that already exist, so they do not change.
+    well_groups: Dict[str, Tuple[int, ...]] = {}
+
+    # Injection wells close to the grid cells that did not have CO2 in the last
+    # time step, found for all these cells at once
+    new_cells = cells_with_co2[~had_co2]
+    close_wells, new_cells_z = _find_close_inj_wells(
+        new_cells, grid_indices, inj_wells, inj_wells_grid_indices
+    )
+    for index, well_pos, z in zip(new_cells.tolist(), close_wells, new_cells_z):
+        if well_pos >= 0:
+            well = inj_wells[well_pos]
+            if well.name not in well_groups:
+                merged_group = groups.check_if_well_is_part_of_larger_group(well.number)
+                well_groups[well.name] = (
+                    (well.number,) if merged_group is None else merged_group
+                )
+            groups.set_cell_groups(index, new_groups=well_groups[well.name])
+            if well.name not in new_z_coords or z not in new_z_coords[well.name]:
+                if well.name not in new_z_coords:
+                    new_z_coords[well.name] = [z]
                 else:
-                    same_cell = False
-                    for cell_i, cell_j, _ in inj_wells_grid_indices[well.name]:
-                        if (i, j) == (cell_i, cell_j):
-                            same_cell = True
-                            break
-                    xyz_close = (
-                        abs(x - well.x) <= INJ_POINT_THRESHOLD_LATERAL
-                        and abs(y - well.y) <= INJ_POINT_THRESHOLD_LATERAL
-                    )
-                if same_cell or xyz_close:
-                    found = True
-                    merged_group = groups.check_if_well_is_part_of_larger_group(
-                        well.number
-                    )
-                    if merged_group is None:
-                        groups.cells[index].set_cell_groups(new_groups=[well.number])
-                    else:
-                        groups.cells[index].set_cell_groups(new_groups=merged_group)
-                    if (
-                        well.name not in new_z_coords
-                        or z not in new_z_coords[well.name]
-                    ):
-                        if well.name not in new_z_coords:
-                            new_z_coords[well.name] = [z]
-                        else:
-                            new_z_coords[well.name].append(z)
-                    break
-            if not found:
-                groups.cells[index].set_undetermined()
+                    new_z_coords[well.name].append(z)
+        else:
+            groups.set_undetermined(index)
     _update_inj_z_coordinates(inj_wells, new_z_coords)
     _find_inj_wells_grid_indices(
         inj_wells_grid_indices, grid, inj_wells
     )  # Might need an update
 
 
+def _find_close_inj_wells(
+    cells: np.ndarray,
+    grid_indices: GridIndices,
+    inj_wells: List[InjectionWellData],
+    inj_wells_grid_indices: Dict[str, List[Tuple[int, int, Optional[int]]]],
+) -> Tuple[List[int], List[float]]:
+    """
+    For each of the given active grid cells, finds the first injection well where
+    the grid cell contains the injection point or is within the distance
+    thresholds of it. Returns the position of that well in inj_wells (-1 if no
+    well is close) and the z-coordinate of the center of each grid cell.
+    """
+    ijk = grid_indices.cell_ijk[cells]
+    xyz = grid_indices.cell_xyz[cells]
+    if len(inj_wells) == 0:
+        return np.full(len(cells), -1).tolist(), xyz[:, 2].tolist()
+    close = np.zeros((len(cells), len(inj_wells)), dtype=bool)
+    for n, well in enumerate(inj_wells):
+        xy_close = (np.abs(xyz[:, 0] - well.x) <= INJ_POINT_THRESHOLD_LATERAL) & (
+            np.abs(xyz[:, 1] - well.y) <= INJ_POINT_THRESHOLD_LATERAL
+        )
+        if well.z is not None:
+            well_ijk = np.array(inj_wells_grid_indices[well.name]).reshape(-1, 3)
+            same_cell = (ijk[:, np.newaxis] == well_ijk).all(axis=2).any(axis=1)
+            z_close = np.abs(xyz[:, 2:] - np.array(well.z)) <= (
+                INJ_POINT_THRESHOLD_VERTICAL
+            )
+            close[:, n] = same_cell | (xy_close & z_close.any(axis=1))
+        else:
+            well_ij = np.array(
+                [(i, j) for (i, j, _) in inj_wells_grid_indices[well.name]]
+            ).reshape(-1, 2)
+            same_cell = (ijk[:, np.newaxis, :2] == well_ij).all(axis=2).any(axis=1)
+            close[:, n] = same_cell | xy_close
+    close_wells = np.where(close.any(axis=1), close.argmax(axis=1), -1)
+    return close_wells.tolist(), xyz[:, 2].tolist()
+
+
 def _update_inj_z_coordinates(
     inj_wells: List[InjectionWellData],
     new_z_coords: Dict[str, List[float]],
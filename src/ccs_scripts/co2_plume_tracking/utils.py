@@ -1,9 +1,10 @@
-import itertools
 import logging
+from collections import Counter
 from dataclasses import dataclass
-from enum import Enum
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
 from resdata.grid import Grid
 
 MAX_STEPS_RESOLVE_CELLS = 20
@@ -21,91 +22,93 @@ class InjectionWellData:
     number: int
 
 
-class Status(Enum):
-    UNDETERMINED = 0
-    NO_CO2 = 1
-    HAS_CO2 = 2
-
-
-class CellGroup:
-    def __init__(self, groups: Optional[List[int]] = None):
-        self.status: Status = Status.NO_CO2
-        self.all_groups: List[int] = []
-        if groups is not None:
-            self.status = Status.HAS_CO2
-            self.all_groups = groups.copy()
-
-    def set_cell_groups(self, new_groups: List[int]):
-        self.status = Status.HAS_CO2
-        self.all_groups = new_groups.copy()
-
-    def set_undetermined(self):
-        self.status = Status.UNDETERMINED
-        self.all_groups = []
+@dataclass
+class GridIndices:
+    """
+    The (i, j, k) and the (x, y, z) of the center of each active grid cell, both
+    with shape (number of active cells, 3), and the active index of each grid
+    cell, indexed by (i, j, k). Inactive grid cells have active index -1.
+    """
 
-    def has_co2(self):
-        return self.status == Status.HAS_CO2
+    cell_ijk: np.ndarray
+    cell_xyz: np.ndarray
+    active_index: np.ndarray
 
-    def has_no_co2(self):
-        return self.status == Status.NO_CO2
 
-    def is_undetermined(self):
-        return self.status == Status.UNDETERMINED
+# Status of a grid cell
+UNDETERMINED = 0
+NO_CO2 = 1
+HAS_CO2 = 2
 
 
 class PlumeGroups:
+    __slots__ = ("status", "all_groups")
+
     def __init__(self, number_of_grid_cells: Optional[int] = None):
-        self.cells: List[CellGroup] = []
-        if number_of_grid_cells is not None:
-            self.cells = [CellGroup() for _ in range(0, number_of_grid_cells)]
+        n_cells = 0 if number_of_grid_cells is None else number_of_grid_cells
+        # Status (UNDETERMINED, NO_CO2 or HAS_CO2) and plume groups for each grid cell
+        self.status = np.full(n_cells, NO_CO2, dtype=np.uint8)
+        self.all_groups: List[Tuple[int, ...]] = [()] * n_cells
 
     def copy(self):
         out = PlumeGroups()
-        out.cells = self.cells.copy()
+        out.status = self.status.copy()
+        out.all_groups = self.all_groups.copy()
         return out
 
-    def resolve_undetermined_cells(self, grid: Grid) -> List:
-        ind_to_resolve = [
-            ind for ind, group in enumerate(self.cells) if group.is_undetermined()
-        ]
+    def set_cell_groups(self, ind: int, new_groups: Tuple[int, ...]):
+        self.status[ind] = HAS_CO2
+        self.all_groups[ind] = new_groups
+
+    def set_undetermined(self, ind: int):
+        self.status[ind] = UNDETERMINED
+        self.all_groups[ind] = ()
+
+    def has_co2(self) -> np.ndarray:
+        return self.status == HAS_CO2
+
+    def has_no_co2(self) -> np.ndarray:
+        return self.status == NO_CO2
+
+    def is_undetermined(self) -> np.ndarray:
+        return self.status == UNDETERMINED
+
+    def resolve_undetermined_cells(self, grid_indices: GridIndices) -> List:
+        ind_to_resolve = np.flatnonzero(self.is_undetermined()).tolist()
+        cell_ijk = grid_indices.cell_ijk
+        active_index = grid_indices.active_index
         counter = 1
         groups_to_merge = []  # A list of list of groups to merge
         while len(ind_to_resolve) > 0 and counter <= MAX_STEPS_RESOLVE_CELLS:
             for ind in ind_to_resolve:
-                ijk = grid.get_ijk(active_index=ind)
-                groups_nearby = self._find_nearest_groups(ijk, grid)
-                if [-1] in groups_nearby:
-                    groups_nearby = [x for x in groups_nearby if x != [-1]]
+                groups_nearby = self._find_nearest_groups(cell_ijk[ind], active_index)
+                if (-1,) in groups_nearby:
+                    groups_nearby = [x for x in groups_nearby if x != (-1,)]
                 if len(groups_nearby) == 1:
-                    self.cells[ind].set_cell_groups(groups_nearby[0])
+                    self.set_cell_groups(ind, groups_nearby[0])
                 elif len(groups_nearby) >= 2:
                     if groups_nearby not in groups_to_merge:
                         groups_to_merge.append(groups_nearby)
                     # Set to first group, but will be overwritten by merge later
-                    self.cells[ind].set_cell_groups(groups_nearby[0])
+                    self.set_cell_groups(ind, groups_nearby[0])
 
-            updated_ind_to_resolve = [
-                ind for ind, group in enumerate(self.cells) if group.is_undetermined()
-            ]
+            updated_ind_to_resolve = self._still_undetermined(ind_to_resolve)
             if len(updated_ind_to_resolve) == len(ind_to_resolve):
                 updated = False
                 for ind in ind_to_resolve:
-                    ijk = grid.get_ijk(active_index=ind)
                     # Wider search radius when looking for nearby groups
+                    # Only the first group found is used, so the other groups
+                    # nearby are not collected
                     for tolerance in range(2, MAX_NEAREST_GROUPS_SEARCH_DISTANCE + 1):
-                        groups_nearby = self._find_nearest_groups(
-                            ijk, grid, tol=tolerance
+                        cells_nearby = self._find_nearby_cells_with_co2(
+                            cell_ijk[ind], active_index, tol=tolerance
                         )
-                        if len(groups_nearby) >= 1:
-                            self.cells[ind].set_cell_groups(groups_nearby[0])
+                        if len(cells_nearby) >= 1:
+                            self.set_cell_groups(ind, self.all_groups[cells_nearby[0]])
                             updated = True
                             break
                 if updated:
-                    updated_ind_to_resolve = [
-                        ind
-                        for ind, group in enumerate(self.cells)
-                        if group.is_undetermined()
-                    ]
+                    updated_ind_to_resolve = self._still_undetermined(ind_to_resolve)
                     ind_to_resolve = updated_ind_to_resolve
                     counter += 1
                     continue
@@ -116,61 +119,54 @@ class PlumeGroups:
 
         # Any unresolved grid cells?
         for ind in ind_to_resolve:
-            self.cells[ind].set_cell_groups([-1])
-
-        # Resolve groups to merge:
-        new_groups_to_merge: List = []
-        for g in groups_to_merge:
-            merged = False
-            for c in g:
-                if merged:
-                    continue
-                # Is group c in a group that is already somewhere new_groups_to_merge?
-                for d in new_groups_to_merge:
-                    if c in d:
-                        merged = True
-                        # List of groups (g) needs to be merged with d
-                        for new_g in g:
-                            if new_g not in d:
-                                d.append(new_g)
-                        break
-            if not merged:
-                new_groups_to_merge.append(g)
-
-        return new_groups_to_merge
-
-    def _find_nearest_groups(self, ijk, grid, tol: int = 1) -> List[List[int]]:
-        out = []
-        (i1, j1, k1) = ijk
-        neigs = list(
-            itertools.product(
-                range(max((i1 - tol), 0), min((i1 + tol), grid.get_nx() - 1) + 1),
-                range(max((j1 - tol), 0), min((j1 + tol), grid.get_ny() - 1) + 1),
-                range(max((k1 - tol), 0), min((k1 + tol), grid.get_nz() - 1) + 1),
+            self.set_cell_groups(ind, (-1,))
+
+        return _combine_groups_to_merge(groups_to_merge)
+
+    def _still_undetermined(self, inds: List[int]) -> List[int]:
+        # Only cells that were undetermined can still be undetermined
+        inds_array = np.array(inds, dtype=int)
+        return inds_array[self.status[inds_array] == UNDETERMINED].tolist()
+
+    def _find_nearest_groups(
+        self, ijk, active_index: np.ndarray, tol: int = 1
+    ) -> List[Tuple[int, ...]]:
+        # Unique groups, in the order they are found
+        return list(
+            dict.fromkeys(
+                self.all_groups[ind]
+                for ind in self._find_nearby_cells_with_co2(
+                    ijk, active_index, tol
+                ).tolist()
             )
         )
 
-        for ijk in neigs:
-            ind = grid.get_active_index(ijk=ijk)
-            if ind != -1 and self.cells[ind].has_co2():
-                all_groups = self.cells[ind].all_groups
-                if all_groups not in out:
-                    out.append(all_groups.copy())
-        return out
+    def _find_nearby_cells_with_co2(
+        self, ijk, active_index: np.ndarray, tol: int = 1
+    ) -> np.ndarray:
+        (i1, j1, k1) = ijk
+        neigs = active_index[
+            max(i1 - tol, 0) : i1 + tol + 1,
+            max(j1 - tol, 0) : j1 + tol + 1,
+            max(k1 - tol, 0) : k1 + tol + 1,
+        ]
 
-    def find_unique_groups(self):
-        unique_groups = []
-        for cell in self.cells:
-            if cell.has_co2():
-                if cell.all_groups not in unique_groups:
-                    unique_groups.append(cell.all_groups)
-            elif cell.is_undetermined() and [-1] not in unique_groups:
-                unique_groups.append([-1])
-        return unique_groups
+        neigs = neigs[neigs != -1]
+        return neigs[self.status[neigs] == HAS_CO2]
+
+    def find_unique_groups(self) -> List[Tuple[int, ...]]:
+        # Undetermined cells are counted as group (-1,)
+        inds = np.flatnonzero(self.status != NO_CO2)
+        return list(
+            dict.fromkeys(
+                self.all_groups[ind] if status == HAS_CO2 else (-1,)
+                for ind, status in zip(inds.tolist(), self.status[inds].tolist())
+            )
+        )
 
     def check_if_well_is_part_of_larger_group(
         self, well_number: int
-    ) -> Optional[List[int]]:
+    ) -> Optional[Tuple[int, ...]]:
         for group in self.find_unique_groups():
             if len(group) > 1 and well_number in group:
                 return group
@@ -182,23 +178,76 @@ class PlumeGroups:
             unique_groups = self.find_unique_groups()
             unique_groups.sort()
             logging.debug(
-                f"Count '-'              : "
-                f"{len([c for c in self.cells if c.has_no_co2()])}"
+                f"Count '-'              : {np.count_nonzero(self.has_no_co2())}"
             )
             logging.debug(
-                f"Count 'undetermined'   : "
-                f"{len([c for c in self.cells if c.is_undetermined()])}"
+                f"Count 'undetermined'   : {np.count_nonzero(self.is_undetermined())}"
+            )
+            # Cell count of each group, counted in a single pass
+            counts = Counter(
+                self.all_groups[ind] for ind in np.flatnonzero(self.has_co2()).tolist()
             )
             for unique_group in unique_groups:
-                n = len(
-                    [
-                        c
-                        for c in self.cells
-                        if c.has_co2() and c.all_groups == unique_group
-                    ]
-                )
-                spaces = 10 - len(str(unique_group))
-                logging.debug(f"Count '{unique_group}' {' ' * spaces}    : {n}")
+                n = counts[unique_group]
+                name = str(list(unique_group))
+                spaces = 10 - len(name)
+                logging.debug(f"Count '{name}' {' ' * spaces}    : {n}")
+
+
+def _combine_groups_to_merge(
+    groups_to_merge: List[List[Tuple[int, ...]]],
+) -> List[List[Tuple[int, ...]]]:
+    """
+    Combines the lists of groups to merge that are connected through common
+    groups (union-find), so that each group is in only one of the returned lists.
+    Lists and groups are in the order they are first found.
+    """
+    parent: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+
+    def find(group: Tuple[int, ...]) -> Tuple[int, ...]:
+        while parent[group] != group:
+            parent[group] = parent[parent[group]]
+            group = parent[group]
+        return group
+
+    for groups in groups_to_merge:
+        for group in groups:
+            parent.setdefault(group, group)
+        for group in groups[1:]:
+            parent[find(group)] = find(groups[0])
+
+    combined: Dict[Tuple[int, ...], List[Tuple[int, ...]]] = {}
+    for group in parent:
+        combined.setdefault(find(group), []).append(group)
+    return list(combined.values())
+
+
+def _grid_indices(grid: Grid) -> GridIndices:
+    """
+    Returns the indices of the grid cells, found once for each calculation as
+    the same grid is used for all time steps
+    """
+    index = grid.export_index(active_only=True)
+    cell_ijk = np.empty((len(index), 3), dtype=np.int32)
+    cell_ijk[index["active"]] = index[["i", "j", "k"]]
+    active_index = np.full(
+        (grid.get_nx(), grid.get_ny(), grid.get_nz()), -1, dtype=np.int32
+    )
+    active_index[index["i"], index["j"], index["k"]] = index["active"]
+    return GridIndices(cell_ijk, active_cell_centers(grid, index), active_index)
+
+
+def active_cell_centers(grid: Grid, index: Optional[pd.DataFrame] = None) -> np.ndarray:
+    """
+    Returns the (x, y, z) coordinates of the center of each active grid cell,
+    ordered by active index, with shape (number of active cells, 3). The index
+    of the active grid cells is exported from the grid if not given.
+    """
+    if index is None:
+        index = grid.export_index(active_only=True)
+    cell_xyz = np.empty((len(index), 3))
+    cell_xyz[index["active"]] = grid.export_position(index)
+    return cell_xyz
 
 
 def assemble_plume_groups_into_dict(plume_groups: List[str]) -> Dict[str, List[int]]:
@@ -1,6 +1,7 @@
 import shutil
 from pathlib import Path
 
+import numpy as np
 import pytest
 import xtgeo
 
@@ -164,3 +165,28 @@ def test_aggregated_map7():
         ]
     )
     shutil.rmtree(str(Path(result)))
+
+
+@pytest.mark.parametrize("yflip, rotation", [(1, 0.0), (-1, 30.0), (-1, 0.0)])
+def test_write_irap_binary_matches_xtgeo(tmp_path, yflip, rotation):
+    values = np.ma.masked_invalid(
+        np.arange(7 * 5, dtype=np.float64).reshape(7, 5) * 0.37
+    )
+    values[1, 2] = np.ma.masked
+    values[6, :] = np.ma.masked
+    surface = xtgeo.RegularSurface(
+        ncol=7,
+        nrow=5,
+        xori=461234.5,
+        yori=5930123.25,
+        xinc=25.0,
+        yinc=12.5,
+        rotation=rotation,
+        yflip=yflip,
+        values=values,
+    )
+    expected = tmp_path / "expected.gri"
+    surface.to_file(expected, fformat="irap_binary")
+    written = tmp_path / "written.gri"
+    grid3d_aggregate_map._write_irap_binary(surface, written)
+    assert written.read_bytes() == expected.read_bytes()
@@ -1,8 +1,9 @@
 from dataclasses import make_dataclass
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
+import pandas as pd
 import pytest
 import scipy.ndimage
 import shapely.geometry
@@ -19,7 +20,6 @@ from ccs_scripts.co2_containment.co2_calculation import (
 )
 from ccs_scripts.co2_containment.co2_containment import (
     calculate_from_co2_data,
-    extract_amount,
     sort_and_replace_nones,
 )
 
@@ -35,6 +35,22 @@ region_info = RegionInfo(
 )
 
 
+def extract_amount(
+    df: pd.DataFrame,
+    c: str,
+    p: str,
+    cv: Optional[bool] = False,
+    ind: int = -1,
+) -> float:
+    """
+    Return the total co2 amount in grid nodes with the specified to phase and location
+    at the latest recorded date (or at a specified index 'ind')
+    """
+    if cv:
+        return df[df["containment"] == c]["amount"].iloc[ind]
+    return df[(df["containment"] == c) & (df["phase"] == p)]["amount"].iloc[ind]
+
+
 def _random_prop(
     dims: Tuple,
     rng,
@@ -455,3 +471,21 @@ def test_calculation_type():
     """Test invalid calculation type exception handling"""
     with pytest.raises(ValueError):
         CalculationType.check_for_key("mass")
+
+
+def test_sort_and_replace_nones():
+    table = pd.DataFrame(
+        {
+            "date": ["2020"] * 6,
+            "amount": np.arange(6.0),
+            "phase": ["total"] * 6,
+            "containment": ["total"] * 6,
+            "zone": ["zoneA", "total", None, "AAA", "ZoneB", "zoneA"],
+            "region": [None] * 5 + ["total"],
+            "plume_group": ["all"] * 6,
+        }
+    )
+    sort_and_replace_nones(table)
+    assert table["zone"].tolist() == ["AAA", "all", "total", "ZoneB", "zoneA", "zoneA"]
+    assert table["region"].tolist() == ["all"] * 5 + ["total"]
+    assert table["amount"].tolist() == [3.0, 2.0, 1.0, 4.0, 0.0, 5.0]
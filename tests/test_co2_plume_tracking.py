@@ -0,0 +1,132 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pytest
+from resdata.grid import Grid
+from resdata.resfile import ResdataFile
+
+from ccs_scripts.co2_plume_tracking.co2_plume_tracking import (
+    _find_close_inj_wells,
+    _find_inj_wells_grid_indices,
+    _initialize_groups_from_prev_step_and_inj_wells,
+    calculate_plume_groups,
+)
+from ccs_scripts.co2_plume_tracking.utils import (
+    InjectionWellData,
+    PlumeGroups,
+    _combine_groups_to_merge,
+    _grid_indices,
+)
+
+
+def _get_synthetic_case(case: str = "eclipse") -> str:
+    file_name = "E_FLT_01-0" if case == "eclipse" else "P_FLT_01-0"
+    return str(
+        Path(__file__).parents[1]
+        / "tests"
+        / "synthetic_model"
+        / "realization-0"
+        / "iter-0"
+        / case
+        / "model"
+        / file_name
+    )
+
+
+def _get_synthetic_grid(case: str = "eclipse") -> Grid:
+    return Grid(f"{_get_synthetic_case(case)}.EGRID")
+
+
+def test_find_close_inj_wells_without_wells():
+    grid = _get_synthetic_grid()
+    cells = np.array([0, 5, 10])
+    close_wells, cells_z = _find_close_inj_wells(cells, _grid_indices(grid), [], {})
+    assert close_wells == [-1, -1, -1]
+    assert cells_z == [grid.get_xyz(active_index=i)[2] for i in cells]
+
+
+def _active_index_in_column(grid: Grid, x: float, y: float) -> int:
+    for k in range(grid.get_nz()):
+        (i, j) = grid.find_cell_xy(x=x, y=y, k=k)
+        active_index = grid.get_active_index(ijk=(i, j, k))
+        if active_index >= 0:
+            return active_index
+    raise ValueError("No active grid cell in column")
+
+
+@pytest.mark.parametrize("merged_first", [True, False])
+def test_new_cells_at_injection_well_join_merged_group(merged_first):
+    # Grid cells carried over from the previous time step are assigned before the
+    # new grid cells. Otherwise, with the carried grid cell of the merged group
+    # after the new grid cells in the ordering, the new grid cell at wellD would
+    # not see the merged group, and would get group (2,).
+    grid = _get_synthetic_grid()
+    inj_wells = [
+        InjectionWellData("wellB", 2150.0, 2150.0, None, 1),
+        InjectionWellData("wellD", 1850.0, 950.0, None, 2),
+        InjectionWellData("wellE", 550.0, 1450.0, None, 3),
+    ]
+    inj_wells_grid_indices: Dict[str, List[Tuple[int, int, Optional[int]]]] = {}
+    _find_inj_wells_grid_indices(inj_wells_grid_indices, grid, inj_wells)
+
+    cell_well_d = _active_index_in_column(grid, 1850.0, 950.0)
+    cell_well_e = _active_index_in_column(grid, 550.0, 1450.0)
+    # Far from all wells, before or after the new grid cells in the ordering
+    cell_merged = 0 if merged_first else grid.get_num_active() - 1
+    prev_groups = PlumeGroups(grid.get_num_active())
+    prev_groups.set_cell_groups(cell_merged, (1, 2))
+
+    groups = PlumeGroups(grid.get_num_active())
+    _initialize_groups_from_prev_step_and_inj_wells(
+        np.array(sorted([cell_well_d, cell_well_e, cell_merged])),
+        prev_groups,
+        grid,
+        _grid_indices(grid),
+        inj_wells,
+        inj_wells_grid_indices,
+        groups,
+    )
+    assert groups.all_groups[cell_merged] == (1, 2)
+    assert groups.all_groups[cell_well_d] == (1, 2)
+    assert groups.all_groups[cell_well_e] == (3,)
+    assert np.count_nonzero(groups.has_co2()) == 3
+
+
+def test_plume_groups_merge_eclipse():
+    inj_wells = [
+        InjectionWellData("wellB", 2150.0, 2150.0, [4038.9], 1),
+        InjectionWellData("wellD", 1850.0, 950.0, None, 2),
+        InjectionWellData("wellE", 550.0, 1450.0, None, 3),
+    ]
+    plume_groups = calculate_plume_groups(
+        "SGAS",
+        0.001,
+        ResdataFile(f"{_get_synthetic_case()}.UNRST"),
+        _get_synthetic_grid(),
+        inj_wells,
+    )
+    labels = [set(step) - {""} for step in plume_groups]
+    assert labels[:2] == [set(), set()]
+    assert labels[2:4] == [{"wellB+wellD"}, {"wellB+wellD"}]
+    assert all(step == {"wellB+wellD+wellE"} for step in labels[4:])
+    assert plume_groups[2].count("wellB+wellD") == 1492
+    assert plume_groups[-1].count("wellB+wellD+wellE") == 1680
+
+
+def test_combine_groups_to_merge():
+    # Overlapping lists are combined
+    assert _combine_groups_to_merge([[(1,), (2,)], [(2,), (3,)]]) == [
+        [(1,), (2,), (3,)]
+    ]
+    # Lists are combined through a later bridging list, groups in the order found
+    assert _combine_groups_to_merge(
+        [[(1,), (2,)], [(4,), (5,)], [(3,), (2,)], [(6,), (7,)], [(5,), (3,)]]
+    ) == [[(1,), (2,), (4,), (5,), (3,)], [(6,), (7,)]]
+    # Separate lists, and groups that have already merged, are kept as they are
+    assert _combine_groups_to_merge([[(1, 2), (3,)], [(4,), (5,)]]) == [
+        [(1, 2), (3,)],
+        [(4,), (5,)],
+    ]
+    assert _combine_groups_to_merge([[(1,), (2,)], [(1,), (2,)]]) == [[(1,), (2,)]]
+    assert _combine_groups_to_merge([]) == []